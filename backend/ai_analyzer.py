@@ -1,12 +1,150 @@
 import os
+import asyncio
+import hashlib
 import logging
+from functools import lru_cache
+import httpx
+import orjson
+from cachetools import TTLCache
 from openai import AsyncOpenAI
-from dotenv import load_dotenv
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401 - HTTP/2 support for httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+ANALYSIS_SYSTEM_PROMPT = """Ești un expert senior în analiză tehnică și fundamentală pentru trading.
+Analizează datele și oferă o interpretare STRUCTURATĂ, PRECISĂ și ACȚIONABILĂ în limba română.
+
+Format OBLIGATORIU (exact 4 secțiuni):
+
+1. 📊 **Aspect Tehnic**: 
+   - Analiza indicatorilor tehnici (RSI, MACD, Trend, Suport/Rezistență)
+   - Identifică setup-ul curent (trending, ranging, overbought, oversold)
+
+2. 💰 **Fundamentale**: 
+   - Sănătate financiară (Revenue, FCF, Debt, Valuation)
+   - Evaluează soliditatea companiei pe termen lung
+
+3. ⚠️ **Riscuri**: 
+   - Identifică riscurile majore (Overbought, Volum scăzut, Earnings, etc.)
+   - Evaluează probabilitatea de eșec
+
+4. 🎯 **Plan de Acțiune**:
+   - Dacă BUY: Preț intrare, SL, TP precis
+   - Dacă WAIT/NEUTRAL: 
+     * **Buy the Dip**: "Așteptați retragere la suport $X (R/R devine Y:1). Setați Limit Order."
+     * **Breakout Alert**: "Monitorizați rezistență $X. Cumpărați DOAR dacă volum > 1.2x."
+     * **Earnings Warning**: "Raport în X zile - Stay in Cash până după publicare."
+   - Dacă SELL: "Take Profit acum - protejați capitalul."
+
+Fii SPECIFIC, DIRECT și UTIL. Include NUMERE CONCRETE (prețuri, procente, niveluri). 
+Evită generalitățile - oferă un plan de acțiune clar pe care traderul îl poate executa imediat."""
+
+BATCH_SYSTEM_PROMPT = ANALYSIS_SYSTEM_PROMPT + """
+
+Primești mai multe simboluri într-un singur mesaj. Răspunde EXCLUSIV cu un obiect JSON
+care mapează fiecare simbol la analiza lui completă (text cu cele 4 secțiuni de mai sus):
+{"SIMBOL": "analiza..."}"""
+
+# Simboluri per request în analyze_batch
+BATCH_SIZE = 10
+
+# Semnale care justifică modelul premium (restul merg pe modelul de rutină)
+PREMIUM_SIGNALS = frozenset({'BUY', 'SELL', 'LIQUIDATE'})
+
+# Client partajat (un singur pool de conexiuni / TLS per proces)
+_client: Optional[AsyncOpenAI] = None
+
+
+def _get_client() -> Optional[AsyncOpenAI]:
+    """Lazily create the shared AsyncOpenAI client (env is loaded by the app, not at import)"""
+    global _client
+    if _client is None:
+        api_key = os.environ.get('OPENAI_API_KEY')
+        if not api_key:
+            return None
+        _client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=30,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        )
+    return _client
+
+
+def _cache_key(symbol: str, analysis_context: str) -> bytes:
+    """Content-addressed key for the analysis cache"""
+    return hashlib.blake2b(f"{symbol}\n{analysis_context}".encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=2048)
+def _format_fundamentals(items: frozenset) -> str:
+    """Format the fundamentals block (cached - fundamentals change once per earnings cycle)"""
+    fund = dict(items)
+    lines = []
+    lines.append("═══ FUNDAMENTALE ═══")
+    
+    # Market Cap
+    if fund.get('market_cap'):
+        mc = fund['market_cap']
+        if mc > 1e12:
+            lines.append(f"• Market Cap: ${mc/1e12:.2f}T")
+        elif mc > 1e9:
+            lines.append(f"• Market Cap: ${mc/1e9:.2f}B")
+        else:
+            lines.append(f"• Market Cap: ${mc/1e6:.2f}M")
+    
+    # Valuation
+    if fund.get('pe_ratio'):
+        lines.append(f"• P/E Ratio: {fund['pe_ratio']:.2f}")
+    if fund.get('price_to_book'):
+        lines.append(f"• P/B Ratio: {fund['price_to_book']:.2f}")
+    
+    # Profitability
+    if fund.get('profit_margin'):
+        lines.append(f"• Profit Margin: {fund['profit_margin']*100:.1f}%")
+    if fund.get('return_on_equity'):
+        lines.append(f"• ROE: {fund['return_on_equity']*100:.1f}%")
+    
+    # Growth
+    if fund.get('revenue'):
+        rev = fund['revenue']
+        if rev > 1e9:
+            lines.append(f"• Revenue (TTM): ${rev/1e9:.2f}B")
+        else:
+            lines.append(f"• Revenue (TTM): ${rev/1e6:.2f}M")
+    
+    if fund.get('revenue_growth'):
+        lines.append(f"• Revenue Growth: {fund['revenue_growth']*100:.1f}%")
+    
+    # Financial Health
+    if fund.get('free_cash_flow'):
+        fcf = fund['free_cash_flow']
+        if fcf > 1e9:
+            lines.append(f"• Free Cash Flow: ${fcf/1e9:.2f}B")
+        elif fcf < 0:
+            lines.append(f"• Free Cash Flow: NEGATIV (${fcf/1e6:.1f}M) ⚠️")
+        else:
+            lines.append(f"• Free Cash Flow: ${fcf/1e6:.2f}M")
+    
+    if fund.get('debt_to_equity'):
+        dte = fund['debt_to_equity']
+        if dte > 200:
+            lines.append(f"• Debt/Equity: {dte:.0f}% ⚠️ RIDICAT")
+        else:
+            lines.append(f"• Debt/Equity: {dte:.1f}%")
+    
+    lines.append("")
+    return "\n".join(lines)
+
+
 class AIAnalyzer:
     def __init__(self):
         # Folosim Emergent LLM Key
@@ -14,7 +152,13 @@ class AIAnalyzer:
         if not self.api_key:
             logger.warning("OPENAI_API_KEY not found in environment - using fallback")
         
-        self.client = AsyncOpenAI(api_key=self.api_key) if self.api_key else None
+        self.client = _get_client()
+        
+        self.model_routine = 'gpt-4o-mini'
+        self.model_premium = 'gpt-4o'
+        
+        # Analize identice (același context) în ultimele 5 minute - fără apel OpenAI
+        self._cache: TTLCache = TTLCache(maxsize=512, ttl=300)
 
     async def analyze(
         self, 
@@ -25,47 +169,82 @@ class AIAnalyzer:
         context: Dict[str, Any], 
         alerts: List[Dict[str, Any]], 
         fundamentals: Optional[Dict[str, Any]] = None,
-        price_change_percent: float = 0.0
+        price_change_percent: float = 0.0,
+        tier: Optional[str] = None
     ) -> str:
+        try:
+            return ''.join([
+                chunk async for chunk in self._stream(
+                    symbol, indicators, risk_data, signal, context, alerts, fundamentals, price_change_percent, tier
+                )
+            ])
+        except Exception:
+            # Stream broke after partial text - never return (or cache) a truncated analysis
+            return self._generate_fallback_analysis(symbol, indicators, signal, risk_data, fundamentals, price_change_percent)
+
+    async def analyze_stream(
+        self, 
+        symbol: str, 
+        indicators: Dict[str, Any], 
+        risk_data: Dict[str, Any], 
+        signal: str, 
+        context: Dict[str, Any], 
+        alerts: List[Dict[str, Any]], 
+        fundamentals: Optional[Dict[str, Any]] = None,
+        price_change_percent: float = 0.0,
+        tier: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Analiza AI livrată incremental (token cu token) pe măsură ce sosește de la OpenAI
+        tier: 'premium' / 'routine' (implicit: ales din semnal și severitatea alertelor)
+        Dacă stream-ul cade după primul fragment, clientul păstrează textul parțial deja trimis
+        """
+        try:
+            async for chunk in self._stream(
+                symbol, indicators, risk_data, signal, context, alerts, fundamentals, price_change_percent, tier
+            ):
+                yield chunk
+        except Exception:
+            return  # already logged; partial text is all the client gets
+
+    async def _stream(
+        self, 
+        symbol: str, 
+        indicators: Dict[str, Any], 
+        risk_data: Dict[str, Any], 
+        signal: str, 
+        context: Dict[str, Any], 
+        alerts: List[Dict[str, Any]], 
+        fundamentals: Optional[Dict[str, Any]] = None,
+        price_change_percent: float = 0.0,
+        tier: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Fragmentele OpenAI (sau fallback-ul dacă eșuează înainte de primul); re-ridică eroarea după text parțial"""
         if not self.client:
             logger.warning("OpenAI client not initialized - using fallback")
-            return self._generate_fallback_analysis(symbol, indicators, signal, risk_data, fundamentals, price_change_percent)
+            yield self._generate_fallback_analysis(symbol, indicators, signal, risk_data, fundamentals, price_change_percent)
+            return
         
+        parts = []
         try:
             analysis_context = self._build_context(symbol, indicators, risk_data, signal, context, alerts, fundamentals, price_change_percent)
             
+            # Contextul include semnalul, deci un semnal schimbat produce altă cheie
+            cache_key = _cache_key(symbol, analysis_context)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"✅ Using cached AI analysis for {symbol}")
+                yield cached
+                return
+            
+            model = self._model_for(tier or self.select_tier(signal, alerts))
+            
             response = await self.client.chat.completions.create(
-                model="gpt-4o",
+                model=model,
                 messages=[
                     {
                         "role": "system", 
-                        "content": """Ești un expert senior în analiză tehnică și fundamentală pentru trading.
-Analizează datele și oferă o interpretare STRUCTURATĂ, PRECISĂ și ACȚIONABILĂ în limba română.
-
-Format OBLIGATORIU (exact 4 secțiuni):
-
-1. 📊 **Aspect Tehnic**: 
-   - Analiza indicatorilor tehnici (RSI, MACD, Trend, Suport/Rezistență)
-   - Identifică setup-ul curent (trending, ranging, overbought, oversold)
-
-2. 💰 **Fundamentale**: 
-   - Sănătate financiară (Revenue, FCF, Debt, Valuation)
-   - Evaluează soliditatea companiei pe termen lung
-
-3. ⚠️ **Riscuri**: 
-   - Identifică riscurile majore (Overbought, Volum scăzut, Earnings, etc.)
-   - Evaluează probabilitatea de eșec
-
-4. 🎯 **Plan de Acțiune**:
-   - Dacă BUY: Preț intrare, SL, TP precis
-   - Dacă WAIT/NEUTRAL: 
-     * **Buy the Dip**: "Așteptați retragere la suport $X (R/R devine Y:1). Setați Limit Order."
-     * **Breakout Alert**: "Monitorizați rezistență $X. Cumpărați DOAR dacă volum > 1.2x."
-     * **Earnings Warning**: "Raport în X zile - Stay in Cash până după publicare."
-   - Dacă SELL: "Take Profit acum - protejați capitalul."
-
-Fii SPECIFIC, DIRECT și UTIL. Include NUMERE CONCRETE (prețuri, procente, niveluri). 
-Evită generalitățile - oferă un plan de acțiune clar pe care traderul îl poate executa imediat."""
+                        "content": ANALYSIS_SYSTEM_PROMPT
                     },
                     {
                         "role": "user", 
@@ -73,14 +252,105 @@ Evită generalitățile - oferă un plan de acțiune clar pe care traderul îl p
                     }
                 ],
                 max_tokens=700,
-                temperature=0.7
+                temperature=0.7,
+                stream=True
             )
             
-            return response.choices[0].message.content
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ''
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            
+            if parts:
+                self._cache[cache_key] = ''.join(parts)
             
         except Exception as e:
             logger.error(f"AI analysis error for {symbol}: {str(e)}")
-            return self._generate_fallback_analysis(symbol, indicators, signal, risk_data, fundamentals, price_change_percent)
+            # Text parțial deja trimis: apelantul decide (analyze -> fallback, stream -> se oprește)
+            if parts:
+                raise
+            yield self._generate_fallback_analysis(symbol, indicators, signal, risk_data, fundamentals, price_change_percent)
+
+    async def analyze_batch(self, items: List[Dict[str, Any]], tier: str = 'routine') -> List[str]:
+        """
+        Analizează mai multe simboluri cu un singur request OpenAI per BATCH_SIZE simboluri
+        items: dict-uri cu aceleași argumente ca analyze(); rezultatele păstrează ordinea
+        tier: scanările de portofoliu folosesc implicit modelul de rutină
+        """
+        results: List[Optional[str]] = [None] * len(items)
+        
+        if not self.client:
+            logger.warning("OpenAI client not initialized - using fallback")
+        else:
+            pending = []
+            for i, item in enumerate(items):
+                analysis_context = self._build_context(
+                    item['symbol'], item['indicators'], item['risk_data'], item['signal'], item['context'],
+                    item['alerts'], item.get('fundamentals'), item.get('price_change_percent', 0.0)
+                )
+                cache_key = _cache_key(item['symbol'], analysis_context)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    pending.append((i, item['symbol'], analysis_context, cache_key))
+            
+            chunks = [pending[start:start + BATCH_SIZE] for start in range(0, len(pending), BATCH_SIZE)]
+            for chunk, analyses in zip(chunks, await asyncio.gather(*(self._request_batch(c, self._model_for(tier)) for c in chunks))):
+                for i, symbol, _, cache_key in chunk:
+                    content = analyses.get(symbol)
+                    if content:
+                        self._cache[cache_key] = content
+                        results[i] = content
+        
+        # Fallback pentru simbolurile fără răspuns
+        for i, item in enumerate(items):
+            if results[i] is None:
+                results[i] = self._generate_fallback_analysis(
+                    item['symbol'], item['indicators'], item['signal'], item['risk_data'],
+                    item.get('fundamentals'), item.get('price_change_percent', 0.0)
+                )
+        
+        return results
+    
+    async def _request_batch(self, chunk: List[tuple], model: str) -> Dict[str, str]:
+        """Un singur request JSON-mode pentru un grup de simboluri"""
+        symbols = [symbol for _, symbol, _, _ in chunk]
+        user_content = "\n\n".join(f"Analizează {symbol}:\n\n{analysis_context}" for _, symbol, analysis_context, _ in chunk)
+        
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=700 * len(chunk),
+                temperature=0.7
+            )
+            
+            analyses = orjson.loads(response.choices[0].message.content)
+            return {symbol: analyses[symbol] for symbol in symbols if isinstance(analyses.get(symbol), str)}
+            
+        except Exception as e:
+            logger.error(f"AI batch analysis error for {', '.join(symbols)}: {str(e)}")
+            return {}
+    
+    @staticmethod
+    def select_tier(signal: str, alerts: List[Dict[str, Any]]) -> str:
+        """Semnale de convingere ridicată sau alerte critice -> premium, restul -> routine"""
+        if signal in PREMIUM_SIGNALS:
+            return 'premium'
+        if any(alert.get('severity') == 'critical' for alert in alerts):
+            return 'premium'
+        return 'routine'
+    
+    def _model_for(self, tier: str) -> str:
+        return self.model_premium if tier == 'premium' else self.model_routine
 
     def _build_context(
         self, 
@@ -134,59 +404,7 @@ Evită generalitățile - oferă un plan de acțiune clar pe care traderul îl p
         
         # 4. Fundamentals (if available)
         if fundamentals:
-            lines.append("═══ FUNDAMENTALE ═══")
-            
-            # Market Cap
-            if fundamentals.get('market_cap'):
-                mc = fundamentals['market_cap']
-                if mc > 1e12:
-                    lines.append(f"• Market Cap: ${mc/1e12:.2f}T")
-                elif mc > 1e9:
-                    lines.append(f"• Market Cap: ${mc/1e9:.2f}B")
-                else:
-                    lines.append(f"• Market Cap: ${mc/1e6:.2f}M")
-            
-            # Valuation
-            if fundamentals.get('pe_ratio'):
-                lines.append(f"• P/E Ratio: {fundamentals['pe_ratio']:.2f}")
-            if fundamentals.get('price_to_book'):
-                lines.append(f"• P/B Ratio: {fundamentals['price_to_book']:.2f}")
-            
-            # Profitability
-            if fundamentals.get('profit_margin'):
-                lines.append(f"• Profit Margin: {fundamentals['profit_margin']*100:.1f}%")
-            if fundamentals.get('return_on_equity'):
-                lines.append(f"• ROE: {fundamentals['return_on_equity']*100:.1f}%")
-            
-            # Growth
-            if fundamentals.get('revenue'):
-                rev = fundamentals['revenue']
-                if rev > 1e9:
-                    lines.append(f"• Revenue (TTM): ${rev/1e9:.2f}B")
-                else:
-                    lines.append(f"• Revenue (TTM): ${rev/1e6:.2f}M")
-            
-            if fundamentals.get('revenue_growth'):
-                lines.append(f"• Revenue Growth: {fundamentals['revenue_growth']*100:.1f}%")
-            
-            # Financial Health
-            if fundamentals.get('free_cash_flow'):
-                fcf = fundamentals['free_cash_flow']
-                if fcf > 1e9:
-                    lines.append(f"• Free Cash Flow: ${fcf/1e9:.2f}B")
-                elif fcf < 0:
-                    lines.append(f"• Free Cash Flow: NEGATIV (${fcf/1e6:.1f}M) ⚠️")
-                else:
-                    lines.append(f"• Free Cash Flow: ${fcf/1e6:.2f}M")
-            
-            if fundamentals.get('debt_to_equity'):
-                dte = fundamentals['debt_to_equity']
-                if dte > 200:
-                    lines.append(f"• Debt/Equity: {dte:.0f}% ⚠️ RIDICAT")
-                else:
-                    lines.append(f"• Debt/Equity: {dte:.1f}%")
-            
-            lines.append("")
+            lines.append(_format_fundamentals(frozenset(fundamentals.items())))
         
         # 5. Market Context
         lines.append("═══ CONTEXT PIAȚĂ ═══")
@@ -2,22 +2,122 @@
 Alerts and Paper Trading Service
 Handles price alerts, watchlist management, and simulated trades
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import uuid
+from collections import Counter
+
+import numpy as np
+from pymongo import UpdateOne
 
 from models import PriceAlert, WatchlistEntry, PaperTrade, StrategyStats
 
 logger = logging.getLogger(__name__)
 
+# Max operations per bulk_write batch
+BULK_FLUSH_SIZE = 1000
+
+# Fields read by the hot paths (avoid decoding whole documents)
+ALERT_CHECK_PROJECTION = {'_id': 0, 'id': 1, 'symbol': 1, 'target_price': 1, 'target_price_cents': 1, 'alert_type': 1}
+TRADE_EVAL_PROJECTION = {
+    '_id': 0, 'id': 1, 'symbol': 1, 'status': 1,
+    'entry_price': 1, 'stop_loss': 1, 'take_profit': 1, 'position_size': 1
+}
+
+# Prices stored as fixed-point integers with 4 decimals
+PRICE_SCALE = 10000
+
+_uuid4 = uuid.uuid4
+
+
+def new_id() -> str:
+    """Compact document id (32-char hex UUID4, no hyphens)"""
+    return _uuid4().hex
+
+
+def to_cents(price: float) -> int:
+    """Quantize a price to a fixed-point int (4 decimals)"""
+    return int(round(price * PRICE_SCALE))
+
+
+def alert_targets(alerts: List[Dict]) -> np.ndarray:
+    """Fixed-point target prices (legacy alerts only have the float field)"""
+    return np.fromiter(
+        (
+            alert['target_price_cents'] if alert.get('target_price_cents') is not None else to_cents(alert['target_price'])
+            for alert in alerts
+        ),
+        dtype=np.int64,
+        count=len(alerts)
+    )
+
+
+def trigger_mask(types: np.ndarray, targets: np.ndarray, current_price) -> np.ndarray:
+    """Evaluate all alerts at once - True where the alert should trigger (price may be per-alert array)"""
+    
+    # take_profit: price >= target, stop_loss: price <= target
+    tp_mask = (types == 'take_profit') & (current_price >= targets)
+    sl_mask = (types == 'stop_loss') & (current_price <= targets)
+    
+    # ideal_entry: price within 0.5% of target
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff_percent = np.abs((current_price - targets) / targets) * 100
+    ie_mask = (types == 'ideal_entry') & (diff_percent <= 0.5)
+    
+    return tp_mask | sl_mask | ie_mask
+
+
+class IndexedService:
+    """Base for services that lazily create their MongoDB indexes on first use"""
+    
+    # (keys, options) pairs matching the query shapes of each service
+    INDEXES: List[Tuple[List[Tuple[str, int]], Dict[str, Any]]] = []
+    
+    def __init__(self, collection):
+        self._indexed_collection = collection
+        self._indexes_ready = False
+        self._indexes_lock = asyncio.Lock()
+    
+    async def _ensure_indexes(self):
+        """Create indexes once, on the first call (does not block startup)"""
+        if self._indexes_ready:
+            return
+        
+        async with self._indexes_lock:
+            if self._indexes_ready:
+                return
+            
+            for keys, options in self.INDEXES:
+                try:
+                    await self._indexed_collection.create_index(keys, background=True, **options)
+                except Exception as e:
+                    logger.error("Index creation error on %s %s: %s", self._indexed_collection.name, keys, e)
+            
+            self._indexes_ready = True
+    
+    async def _insert_chunked(self, docs: List[Dict]) -> int:
+        """insert_many in BULK_FLUSH_SIZE chunks (unordered - ids are generated unique)"""
+        inserted = 0
+        for start in range(0, len(docs), BULK_FLUSH_SIZE):
+            result = await self._indexed_collection.insert_many(docs[start:start + BULK_FLUSH_SIZE], ordered=False)
+            inserted += len(result.inserted_ids)
+        return inserted
+
 
-class AlertsService:
+class AlertsService(IndexedService):
     """Service for managing price alerts"""
     
+    INDEXES = [
+        ([('triggered', 1), ('symbol', 1), ('created_at', -1)], {}),
+        ([('id', 1)], {'unique': True}),
+    ]
+    
     def __init__(self, db):
         self.db = db
         self.alerts_collection = db.price_alerts
+        super().__init__(self.alerts_collection)
         
     async def create_alert(
         self,
@@ -29,84 +129,158 @@ class AlertsService:
     ) -> Dict[str, Any]:
         """Create a new price alert"""
         
-        alert = {
-            'id': str(uuid.uuid4()),
+        await self._ensure_indexes()
+        
+        alert = self._new_alert(symbol, target_price, alert_type, current_price, user_note, datetime.now())
+        
+        await self.alerts_collection.insert_one(alert)
+        
+        logger.info("✅ Created alert: %s @ $%s (%s)", symbol, target_price, alert_type)
+        
+        return alert
+    
+    async def create_alerts_bulk(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many alerts (create_alert kwargs per item) with chunked insert_many"""
+        
+        await self._ensure_indexes()
+        
+        now = datetime.now()
+        docs = [
+            self._new_alert(
+                a['symbol'], a['target_price'], a['alert_type'], a['current_price'], a.get('user_note'), now
+            )
+            for a in alerts
+        ]
+        
+        inserted = await self._insert_chunked(docs)
+        
+        logger.info("✅ Created %s alerts (bulk)", inserted)
+        
+        return docs
+    
+    @staticmethod
+    def _new_alert(
+        symbol: str,
+        target_price: float,
+        alert_type: str,
+        current_price: float,
+        user_note: Optional[str],
+        created_at: datetime
+    ) -> Dict[str, Any]:
+        return {
+            'id': new_id(),
             'symbol': symbol,
             'target_price': target_price,
+            'target_price_cents': to_cents(target_price),
             'alert_type': alert_type,
             'current_price': current_price,
-            'created_at': datetime.now(),
+            'created_at': created_at,
             'triggered': False,
             'triggered_at': None,
             'user_note': user_note
         }
-        
-        await self.alerts_collection.insert_one(alert)
-        
-        logger.info(f"✅ Created alert: {symbol} @ ${target_price} ({alert_type})")
-        
-        return alert
     
-    async def get_active_alerts(self, symbol: Optional[str] = None) -> List[Dict]:
+    async def get_active_alerts(
+        self,
+        symbol: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict]:
         """Get all active (non-triggered) alerts"""
         
+        await self._ensure_indexes()
+        
         query = {'triggered': False}
         if symbol:
             query['symbol'] = symbol
         
-        alerts = await self.alerts_collection.find(query).sort('created_at', -1).to_list(100)
+        alerts = await self.alerts_collection.find(query, projection).sort('created_at', -1).to_list(100)
         return alerts
     
     async def check_and_trigger_alerts(self, symbol: str, current_price: float) -> List[Dict]:
         """Check if any alerts should be triggered"""
         
-        triggered_alerts = []
+        await self._ensure_indexes()
+        
+        now = datetime.now()
         
         # Get active alerts for this symbol
-        alerts = await self.get_active_alerts(symbol)
+        alerts = await self.get_active_alerts(symbol, ALERT_CHECK_PROJECTION)
         
-        for alert in alerts:
-            target_price = alert['target_price']
-            alert_type = alert['alert_type']
-            
-            # Check if price crossed the target
-            should_trigger = False
-            
-            if alert_type == 'take_profit':
-                # Trigger if current price >= target
-                should_trigger = current_price >= target_price
-            elif alert_type == 'stop_loss':
-                # Trigger if current price <= target
-                should_trigger = current_price <= target_price
-            elif alert_type == 'ideal_entry':
-                # Trigger if price is within 0.5% of target
-                diff_percent = abs((current_price - target_price) / target_price) * 100
-                should_trigger = diff_percent <= 0.5
+        triggered_alerts = []
+        if alerts:
+            mask = trigger_mask(
+                np.array([alert['alert_type'] for alert in alerts]),
+                alert_targets(alerts),
+                to_cents(current_price)
+            )
             
-            if should_trigger:
-                # Update alert as triggered
-                await self.alerts_collection.update_one(
-                    {'id': alert['id']},
-                    {
-                        '$set': {
-                            'triggered': True,
-                            'triggered_at': datetime.now()
-                        }
-                    }
-                )
-                
+            for i in np.flatnonzero(mask):
+                alert = alerts[i]
                 triggered_alerts.append(alert)
-                logger.info(f"🔔 Alert triggered: {symbol} @ ${current_price} ({alert_type})")
+                logger.info("🔔 Alert triggered: %s @ $%s (%s)", symbol, current_price, alert['alert_type'])
+        
+        # Mark all triggered alerts in a single round-trip
+        if triggered_alerts:
+            ops = [
+                UpdateOne({'id': a['id']}, {'$set': {'triggered': True, 'triggered_at': now}})
+                for a in triggered_alerts
+            ]
+            await self.alerts_collection.bulk_write(ops, ordered=False)
         
         return triggered_alerts
+    
+    async def check_alerts_for_symbols(self, prices: Dict[str, float]) -> Dict[str, List[Dict]]:
+        """Check alerts for a symbol -> price map with one query and one bulk_write"""
+        
+        await self._ensure_indexes()
+        
+        if not prices:
+            return {}
+        
+        now = datetime.now()
+        
+        alerts = await self.alerts_collection.find(
+            {'triggered': False, 'symbol': {'$in': list(prices)}},
+            ALERT_CHECK_PROJECTION
+        ).to_list(10000)
+        
+        triggered: Dict[str, List[Dict]] = {}
+        if not alerts:
+            return triggered
+        
+        # Each alert is compared against the price of its own symbol
+        mask = trigger_mask(
+            np.array([alert['alert_type'] for alert in alerts]),
+            alert_targets(alerts),
+            np.fromiter((to_cents(prices[alert['symbol']]) for alert in alerts), dtype=np.int64, count=len(alerts))
+        )
+        
+        ops = []
+        for i in np.flatnonzero(mask):
+            alert = alerts[i]
+            triggered.setdefault(alert['symbol'], []).append(alert)
+            ops.append(UpdateOne({'id': alert['id']}, {'$set': {'triggered': True, 'triggered_at': now}}))
+            logger.info("🔔 Alert triggered: %s @ $%s (%s)", alert['symbol'], prices[alert['symbol']], alert['alert_type'])
+        
+        if ops:
+            await self.alerts_collection.bulk_write(ops, ordered=False)
+        
+        return triggered
 
 
-class WatchlistService:
+class WatchlistService(IndexedService):
     """Service for managing potential investments watchlist"""
     
+    INDEXES = [
+        ([('symbol', 1), ('status', 1)], {}),
+        ([('status', 1), ('added_at', -1)], {}),
+        ([('id', 1)], {'unique': True}),
+    ]
+    
     def __init__(self, db):
         self.db = db
         self.watchlist_collection = db.watchlist
+        super().__init__(self.watchlist_collection)
         
     async def add_to_watchlist(
         self,
@@ -120,6 +294,8 @@ class WatchlistService:
     ) -> Dict[str, Any]:
         """Add symbol to watchlist"""
         
+        await self._ensure_indexes()
+        
         # Calculate initial P/L
         pnl_percent = ((current_price - ideal_entry_price) / ideal_entry_price) * 100
         
@@ -129,7 +305,7 @@ class WatchlistService:
             status = 'triggered'
         
         entry = {
-            'id': str(uuid.uuid4()),
+            'id': new_id(),
             'symbol': symbol,
             'ideal_entry_price': ideal_entry_price,
             'current_price': current_price,
@@ -144,52 +320,71 @@ class WatchlistService:
         
         await self.watchlist_collection.insert_one(entry)
         
-        logger.info(f"✅ Added to watchlist: {symbol} @ ${ideal_entry_price}")
+        logger.info("✅ Added to watchlist: %s @ $%s", symbol, ideal_entry_price)
         
         return entry
     
-    async def get_watchlist(self, status: Optional[str] = None) -> List[Dict]:
+    async def get_watchlist(
+        self,
+        status: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict]:
         """Get watchlist entries"""
         
+        await self._ensure_indexes()
+        
         query = {}
         if status:
             query['status'] = status
         
-        entries = await self.watchlist_collection.find(query).sort('added_at', -1).to_list(100)
+        entries = await self.watchlist_collection.find(query, projection).sort('added_at', -1).to_list(100)
         return entries
     
     async def update_watchlist_prices(self, symbol: str, current_price: float):
         """Update current prices and P/L for watchlist entries"""
         
-        entries = await self.watchlist_collection.find({'symbol': symbol, 'status': 'pending'}).to_list(100)
+        await self._ensure_indexes()
         
-        for entry in entries:
-            ideal_entry = entry['ideal_entry_price']
-            pnl_percent = ((current_price - ideal_entry) / ideal_entry) * 100
-            
-            # Check if triggered
-            status = entry['status']
-            if current_price <= ideal_entry * 1.01:
-                status = 'triggered'
-            
-            await self.watchlist_collection.update_one(
-                {'id': entry['id']},
+        # Computed server-side in one update_many (no read phase, no per-entry writes)
+        await self.watchlist_collection.update_many(
+            {'symbol': symbol, 'status': 'pending'},
+            [
                 {
                     '$set': {
                         'current_price': current_price,
-                        'pnl_percent': pnl_percent,
-                        'status': status
+                        'pnl_percent': {
+                            '$multiply': [
+                                {'$divide': [{'$subtract': [current_price, '$ideal_entry_price']}, '$ideal_entry_price']},
+                                100
+                            ]
+                        },
+                        # Triggered when within 1% of entry
+                        'status': {
+                            '$cond': [
+                                {'$lte': [current_price, {'$multiply': ['$ideal_entry_price', 1.01]}]},
+                                'triggered',
+                                '$status'
+                            ]
+                        }
                     }
                 }
-            )
+            ]
+        )
 
 
-class PaperTradingService:
+class PaperTradingService(IndexedService):
     """Service for simulated trades"""
     
+    INDEXES = [
+        ([('status', 1), ('entry_date', -1)], {}),
+        ([('entry_date', -1), ('status', 1)], {}),
+        ([('id', 1)], {'unique': True}),
+    ]
+    
     def __init__(self, db):
         self.db = db
         self.trades_collection = db.paper_trades
+        super().__init__(self.trades_collection)
         
     async def create_trade(
         self,
@@ -203,14 +398,57 @@ class PaperTradingService:
     ) -> Dict[str, Any]:
         """Create a simulated trade"""
         
-        trade = {
-            'id': str(uuid.uuid4()),
+        await self._ensure_indexes()
+        
+        trade = self._new_trade(
+            symbol, entry_price, stop_loss, take_profit, position_size, strategy, notes, datetime.now()
+        )
+        
+        await self.trades_collection.insert_one(trade)
+        
+        logger.info("🧪 Created paper trade: %s @ $%s (%s shares)", symbol, entry_price, position_size)
+        
+        return trade
+    
+    async def create_trades_bulk(self, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many paper trades (create_trade kwargs per item) with chunked insert_many"""
+        
+        await self._ensure_indexes()
+        
+        now = datetime.now()
+        docs = [
+            self._new_trade(
+                t['symbol'], t['entry_price'], t['stop_loss'], t['take_profit'],
+                t.get('position_size', 100), t.get('strategy'), t.get('notes'), now
+            )
+            for t in trades
+        ]
+        
+        inserted = await self._insert_chunked(docs)
+        
+        logger.info("🧪 Created %s paper trades (bulk)", inserted)
+        
+        return docs
+    
+    @staticmethod
+    def _new_trade(
+        symbol: str,
+        entry_price: float,
+        stop_loss: float,
+        take_profit: float,
+        position_size: int,
+        strategy: Optional[str],
+        notes: Optional[str],
+        entry_date: datetime
+    ) -> Dict[str, Any]:
+        return {
+            'id': new_id(),
             'symbol': symbol,
             'entry_price': entry_price,
             'stop_loss': stop_loss,
             'take_profit': take_profit,
             'position_size': position_size,
-            'entry_date': datetime.now(),
+            'entry_date': entry_date,
             'current_price': entry_price,
             'status': 'active',
             'exit_date': None,
@@ -220,25 +458,24 @@ class PaperTradingService:
             'notes': notes,
             'strategy': strategy
         }
-        
-        await self.trades_collection.insert_one(trade)
-        
-        logger.info(f"🧪 Created paper trade: {symbol} @ ${entry_price} ({position_size} shares)")
-        
-        return trade
     
     async def get_active_trades(self) -> List[Dict]:
         """Get all active trades"""
         
+        await self._ensure_indexes()
+        
         trades = await self.trades_collection.find({'status': 'active'}).sort('entry_date', -1).to_list(100)
         return trades
     
-    async def get_all_trades(self, days: int = 30) -> List[Dict]:
+    async def get_all_trades(self, days: int = 30, projection: Optional[Dict[str, int]] = None) -> List[Dict]:
         """Get all trades from last X days"""
         
+        await self._ensure_indexes()
+        
         cutoff_date = datetime.now() - timedelta(days=days)
         trades = await self.trades_collection.find(
-            {'entry_date': {'$gte': cutoff_date}}
+            {'entry_date': {'$gte': cutoff_date}},
+            projection
         ).sort('entry_date', -1).to_list(1000)
         
         return trades
@@ -246,11 +483,61 @@ class PaperTradingService:
     async def update_trade_price(self, trade_id: str, current_price: float) -> Optional[Dict]:
         """Update trade with current price and check for exit"""
         
+        await self._ensure_indexes()
+        
+        now = datetime.now()
+        
         trade = await self.trades_collection.find_one({'id': trade_id})
         
         if not trade or trade['status'] != 'active':
             return None
         
+        update = self._evaluate_trade(trade, current_price, now)
+        
+        # Update trade
+        await self.trades_collection.update_one(
+            {'id': trade_id},
+            {'$set': update}
+        )
+        
+        return {**trade, 'current_price': current_price, 'pnl_percent': update['pnl_percent'], 'status': update['status']}
+    
+    async def update_many_trade_prices(self, prices: Dict[str, float]) -> List[Dict]:
+        """Update all active trades for the given symbol -> price map (batched)"""
+        
+        await self._ensure_indexes()
+        
+        if not prices:
+            return []
+        
+        now = datetime.now()
+        updated_trades = []
+        ops = []
+        
+        cursor = self.trades_collection.find(
+            {'status': 'active', 'symbol': {'$in': list(prices)}},
+            TRADE_EVAL_PROJECTION
+        )
+        async for trade in cursor:
+            current_price = prices[trade['symbol']]
+            update = self._evaluate_trade(trade, current_price, now)
+            
+            ops.append(UpdateOne({'id': trade['id']}, {'$set': update}))
+            updated_trades.append({**trade, 'current_price': current_price, 'pnl_percent': update['pnl_percent'], 'status': update['status']})
+            
+            # Bound memory on large portfolios
+            if len(ops) >= BULK_FLUSH_SIZE:
+                await self.trades_collection.bulk_write(ops, ordered=False)
+                ops = []
+        
+        if ops:
+            await self.trades_collection.bulk_write(ops, ordered=False)
+        
+        return updated_trades
+    
+    def _evaluate_trade(self, trade: Dict, current_price: float, now: datetime) -> Dict[str, Any]:
+        """Calculate P/L and exit status of a trade at the given price"""
+        
         entry_price = trade['entry_price']
         stop_loss = trade['stop_loss']
         take_profit = trade['take_profit']
@@ -268,48 +555,65 @@ class PaperTradingService:
         if current_price >= take_profit:
             status = 'success'
             exit_price = take_profit
-            exit_date = datetime.now()
-            logger.info(f"✅ Paper trade SUCCESS: {trade['symbol']} hit TP @ ${take_profit}")
+            exit_date = now
+            logger.info("✅ Paper trade SUCCESS: %s hit TP @ $%s", trade['symbol'], take_profit)
         
         elif current_price <= stop_loss:
             status = 'failed'
             exit_price = stop_loss
-            exit_date = datetime.now()
-            logger.warning(f"❌ Paper trade FAILED: {trade['symbol']} hit SL @ ${stop_loss}")
+            exit_date = now
+            logger.warning("❌ Paper trade FAILED: %s hit SL @ $%s", trade['symbol'], stop_loss)
         
-        # Update trade
-        await self.trades_collection.update_one(
-            {'id': trade_id},
-            {
-                '$set': {
-                    'current_price': current_price,
-                    'pnl_percent': pnl_percent,
-                    'pnl_amount': pnl_amount,
-                    'status': status,
-                    'exit_price': exit_price,
-                    'exit_date': exit_date
-                }
-            }
-        )
-        
-        return {**trade, 'current_price': current_price, 'pnl_percent': pnl_percent, 'status': status}
+        return {
+            'current_price': current_price,
+            'pnl_percent': pnl_percent,
+            'pnl_amount': pnl_amount,
+            'status': status,
+            'exit_price': exit_price,
+            'exit_date': exit_date
+        }
     
     async def get_strategy_stats(self, days: int = 30) -> Dict[str, Any]:
         """Calculate strategy performance statistics"""
         
-        trades = await self.get_all_trades(days)
+        await self._ensure_indexes()
+        
+        cutoff_date = datetime.now() - timedelta(days=days)
         
-        total_trades = len(trades)
-        successful_trades = len([t for t in trades if t['status'] == 'success'])
-        failed_trades = len([t for t in trades if t['status'] == 'failed'])
-        active_trades = len([t for t in trades if t['status'] == 'active'])
+        # One summary document per status, computed server-side
+        pipeline = [
+            {'$match': {'entry_date': {'$gte': cutoff_date}}},
+            {'$group': {
+                '_id': '$status',
+                'count': {'$sum': 1},
+                'pnl_percent_sum': {'$sum': '$pnl_percent'},
+                'pnl_amount_sum': {'$sum': '$pnl_amount'}
+            }}
+        ]
+        groups = await self.trades_collection.aggregate(pipeline).to_list(None)
+        
+        # Single pass over the status groups
+        counts = Counter()
+        total_trades = 0
+        closed_count = 0
+        pnl_percent_sum = 0.0
+        total_pnl = 0.0
+        for g in groups:
+            counts[g['_id']] = g['count']
+            total_trades += g['count']
+            if g['_id'] in ('success', 'failed'):
+                closed_count += g['count']
+                pnl_percent_sum += g['pnl_percent_sum']
+                total_pnl += g['pnl_amount_sum']
+        
+        successful_trades = counts['success']
+        failed_trades = counts['failed']
+        active_trades = counts['active']
         
         success_rate = (successful_trades / total_trades * 100) if total_trades > 0 else 0
         
-        # Calculate average P/L for closed trades
-        closed_trades = [t for t in trades if t['status'] in ['success', 'failed']]
-        average_pnl = sum([t.get('pnl_percent', 0) for t in closed_trades]) / len(closed_trades) if closed_trades else 0
-        total_pnl = sum([t.get('pnl_amount', 0) for t in closed_trades])
+        # Average P/L for closed trades
+        average_pnl = pnl_percent_sum / closed_count if closed_count else 0
         
         return {
             'total_trades': total_trades,
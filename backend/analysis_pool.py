@@ -0,0 +1,50 @@
+"""
+Analysis Process Pool
+CPU-bound indicator + risk math runs in worker processes so the event loop keeps serving
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Tuple
+
+import pandas as pd
+
+from technical_analysis import TechnicalAnalyzer, warm_jit
+from risk_calculator import RiskCalculator
+
+logger = logging.getLogger(__name__)
+
+# Fixed small cap - each spawn worker is a full interpreter with pandas/numba loaded
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+
+# spawn: workers import only this module (no Mongo client / app state inherited via fork)
+EXECUTOR = ProcessPoolExecutor(
+    max_workers=POOL_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+    initializer=warm_jit
+)
+
+
+def compute_indicators_and_risk(data: pd.DataFrame, lookback_days: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Top-level (picklable) worker: all indicators + risk/reward for one OHLC frame"""
+    indicators = TechnicalAnalyzer(data).calculate_all_indicators()
+    risk_data = RiskCalculator(data, indicators).calculate_risk_reward(lookback_days=lookback_days)
+    return indicators, risk_data
+
+
+async def run_analysis(data: pd.DataFrame, lookback_days: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Run compute_indicators_and_risk in the process pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, compute_indicators_and_risk, data, lookback_days)
+
+
+async def prime():
+    """Start every worker now (imports + JIT load via the initializer) instead of on the first /analyze"""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(EXECUTOR, warm_jit) for _ in range(POOL_WORKERS)))
+
+
+def shutdown():
+    EXECUTOR.shutdown(wait=False, cancel_futures=True)
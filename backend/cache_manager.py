@@ -7,6 +7,9 @@ import shutil
 import logging
 from pathlib import Path
 
+import data_providers
+from reality_check import reality_check
+
 logger = logging.getLogger(__name__)
 
 # Cache directories
@@ -18,6 +21,10 @@ def clear_all_cache():
     """Clear all cache directories"""
     cleared = []
     
+    # In-memory caches sit in front of the files
+    data_providers.clear_memory_cache()
+    reality_check.clear_memory_cache()
+    
     # Clear trading cache
     if os.path.exists(TRADING_CACHE_DIR):
         try:
@@ -45,6 +52,9 @@ def clear_symbol_cache(symbol: str):
     """Clear cache for a specific symbol"""
     cleared = []
     
+    data_providers.clear_memory_cache(symbol)
+    reality_check.clear_memory_cache(symbol)
+    
     # Clear trading cache for symbol
     if os.path.exists(TRADING_CACHE_DIR):
         for file in Path(TRADING_CACHE_DIR).glob(f"{symbol}_*"):
@@ -1,12 +1,20 @@
 import yfinance as yf
+from yf_session import POOL
 import pandas as pd
-from typing import Optional, Dict, List, Any
-from fuzzywuzzy import fuzz, process
+from typing import Optional, Dict, List, Any, Tuple
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 import aiohttp
 import logging
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+import asyncio
+import functools
 import os
+import threading
+import time
+
+import orjson
+from cachetools import TLRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +26,19 @@ CACHE_DURATION_MINUTES_OHLC = 1  # OHLC data cache - 1 MINUT pentru date LIVE!
 # Ensure cache directory exists
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# In-process cache: (symbol, data_type) -> (data, monotonic expiry); disk is write-through.
+# Each entry is evicted at its own expiry and the LRU bound caps resident OHLC DataFrames
+MEM_CACHE_MAXSIZE = 512
+_MEM_CACHE: TLRUCache = TLRUCache(
+    maxsize=MEM_CACHE_MAXSIZE,
+    ttu=lambda _key, value, _now: value[1],
+    timer=time.monotonic
+)
+_CACHE_LOCK = threading.Lock()
+
 # Extended stock symbols for fuzzy matching (100+ popular symbols)
-COMMON_SYMBOLS = [
+# Tuple (ordered, for iteration / RapidFuzz) + set (O(1) membership), deduplicated
+COMMON_SYMBOLS_TUPLE = tuple(dict.fromkeys([
     # Mega Cap Tech
     "AAPL", "MSFT", "GOOGL", "GOOG", "AMZN", "NVDA", "META", "TSLA", "AVGO", "ORCL",
     # Large Cap Tech
@@ -60,7 +79,8 @@ COMMON_SYMBOLS = [
     "TSM", "ASML", "LRCX", "KLAC", "MRVL", "ON", "SWKS", "QRVO",
     # International
     "BABA", "JD", "PDD", "BIDU", "NIO", "TME"
-]
+]))
+COMMON_SYMBOLS_SET = set(COMMON_SYMBOLS_TUPLE)
 
 COMPANY_NAMES = {
     "AAPL": "Apple Inc.",
@@ -110,111 +130,325 @@ COMPANY_NAMES = {
 # Dynamic symbols cache (populated on-demand)
 DYNAMIC_SYMBOLS = {}
 
+# Cuvinte generice din numele companiilor (nu sunt indexate în trie)
+NAME_STOPWORDS = {"INC", "CORP", "CORPORATION", "CO", "LTD", "THE", "GROUP", "HOLDINGS", "HOLDING", "PLC", "SE", "NV", "COMPANY", "AND"}
+
+
+class SymbolTrie:
+    """Prefix trie - each node keeps the symbols under its prefix, so a lookup is O(len(query))"""
+    
+    def __init__(self):
+        self.root = {'children': {}, 'symbols': []}
+    
+    def insert(self, key: str, symbol: str):
+        node = self.root
+        for ch in key:
+            node = node['children'].setdefault(ch, {'children': {}, 'symbols': []})
+            if symbol not in node['symbols']:
+                node['symbols'].append(symbol)
+    
+    def search(self, prefix: str) -> List[str]:
+        node = self.root
+        for ch in prefix:
+            node = node['children'].get(ch)
+            if node is None:
+                return []
+        return node['symbols']
+
+
+def name_tokens(name: str) -> List[str]:
+    """Uppercase alphanumeric tokens of a company name, without generic words"""
+    tokens = "".join(ch if ch.isalnum() else " " for ch in name.upper()).split()
+    return [t for t in tokens if len(t) > 1 and t not in NAME_STOPWORDS]
+
+
+def index_symbol(symbol: str, name: Optional[str] = None):
+    """Add a symbol (and its company name tokens) to the prefix tries"""
+    SYMBOL_TRIE.insert(symbol, symbol)
+    if name:
+        for token in name_tokens(name):
+            NAME_TRIE.insert(token, symbol)
+
+
+SYMBOL_TRIE = SymbolTrie()
+NAME_TRIE = SymbolTrie()
+for _symbol in COMMON_SYMBOLS_TUPLE:
+    index_symbol(_symbol, COMPANY_NAMES.get(_symbol))
+
+# Reverse index for name fuzzy matching (updated in fetch_symbol_on_demand, not per query)
+_NAME_TO_SYMBOL = {v.lower(): k for k, v in COMPANY_NAMES.items()}
+_COMPANY_NAMES_LOWER = list(_NAME_TO_SYMBOL.keys())
+_COMPANY_NAMES_PROCESSED = [default_process(name) for name in _COMPANY_NAMES_LOWER]
+
+# Guards the search structures above when fetch_symbol_on_demand adds a symbol
+_SYMBOLS_LOCK = asyncio.Lock()
+
+
+def _to_float(value) -> Optional[float]:
+    """fast_info can return numpy scalars - convert for JSON"""
+    return None if value is None else float(value)
+
 
 def get_cache_path(symbol: str, data_type: str) -> str:
     """Get cache file path for a symbol"""
     return os.path.join(CACHE_DIR, f"{symbol}_{data_type}.json")
 
 
+def cache_ttl_seconds(data_type: str) -> float:
+    """OHLC: 1 minute (LIVE data), everything else: 1 hour"""
+    if data_type.startswith('ohlc'):
+        return CACHE_DURATION_MINUTES_OHLC * 60
+    return CACHE_DURATION_HOURS * 3600
+
+
+def cache_age_seconds(cache_path: str) -> Optional[float]:
+    """Age of a cache file from a single stat() call (None if missing)"""
+    try:
+        return time.time() - os.stat(cache_path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
 def is_cache_valid(cache_path: str, cache_type: str = 'default') -> bool:
     """Check if cache file is still valid"""
-    if not os.path.exists(cache_path):
+    age = cache_age_seconds(cache_path)
+    if age is None:
         return False
     
-    file_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-    
     # OHLC data: 1 minute cache for LIVE data
     if cache_type == 'ohlc':
-        return datetime.now() - file_time < timedelta(minutes=CACHE_DURATION_MINUTES_OHLC)
+        return age < CACHE_DURATION_MINUTES_OHLC * 60
     
     # Default: 1 hour for fundamentals, etc.
-    return datetime.now() - file_time < timedelta(hours=CACHE_DURATION_HOURS)
+    return age < CACHE_DURATION_HOURS * 3600
 
 
 def read_cache(symbol: str, data_type: str) -> Optional[Dict]:
-    """Read data from cache"""
+    """Read data from cache (memory first, disk only after a restart)"""
+    key = (symbol, data_type)
+    
+    with _CACHE_LOCK:
+        entry = _MEM_CACHE.get(key)
+    if entry is not None:
+        return entry[0]
+    
     cache_path = get_cache_path(symbol, data_type)
-    if is_cache_valid(cache_path):
+    age = cache_age_seconds(cache_path)
+    ttl = cache_ttl_seconds(data_type)
+    if age is not None and age < ttl:
         try:
-            with open(cache_path, 'r') as f:
-                return json.load(f)
+            with open(cache_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            
+            with _CACHE_LOCK:
+                _MEM_CACHE[key] = (data, time.monotonic() + ttl - age)
+            return data
         except Exception as e:
             logger.error(f"Cache read error: {e}")
     return None
 
 
+def _write_cache_file(cache_path: str, payload: bytes):
+    try:
+        with open(cache_path, 'wb') as f:
+            f.write(payload)
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
+
+
+def _write_ohlc_file(cache_path: str, df: pd.DataFrame):
+    try:
+        df.to_parquet(cache_path, engine='pyarrow', compression='snappy', index=False)
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
+
+
+def _run_in_background(func, *args):
+    """Disk write off the event loop when called from a request"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args)
+    else:
+        loop.run_in_executor(None, func, *args)
+
+
 def write_cache(symbol: str, data_type: str, data: Dict):
-    """Write data to cache"""
+    """Write data to cache (memory now, disk in the background)"""
+    with _CACHE_LOCK:
+        _MEM_CACHE[(symbol, data_type)] = (data, time.monotonic() + cache_ttl_seconds(data_type))
+    
     cache_path = get_cache_path(symbol, data_type)
     try:
-        with open(cache_path, 'w') as f:
-            json.dump(data, f)
+        payload = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
     except Exception as e:
         logger.error(f"Cache write error: {e}")
+        return
+    
+    _run_in_background(_write_cache_file, cache_path, payload)
+
+
+def get_ohlc_cache_path(symbol: str, cache_key: str) -> str:
+    """OHLC is cached columnar (Parquet) - dates and dtypes survive the round-trip"""
+    return os.path.join(CACHE_DIR, f"{symbol}_ohlc_{cache_key}.parquet")
+
+
+def _load_ohlc_file(key: Tuple[str, str], cache_path: str) -> Optional[pd.DataFrame]:
+    """Parquet read + memory fill (runs in a worker thread)"""
+    age = cache_age_seconds(cache_path)
+    if age is not None and age < CACHE_DURATION_MINUTES_OHLC * 60:
+        try:
+            df = pd.read_parquet(cache_path, engine='pyarrow')
+            
+            with _CACHE_LOCK:
+                _MEM_CACHE[key] = (df, time.monotonic() + CACHE_DURATION_MINUTES_OHLC * 60 - age)
+            return df.copy()
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+    return None
+
+
+async def read_ohlc_cache(symbol: str, cache_key: str) -> Optional[pd.DataFrame]:
+    """Read OHLC DataFrame from cache (memory first, Parquet after a restart - off the event loop)"""
+    key = (symbol, f"ohlc_{cache_key}")
+    
+    with _CACHE_LOCK:
+        entry = _MEM_CACHE.get(key)
+    if entry is not None:
+        return entry[0].copy()
+    
+    return await asyncio.to_thread(_load_ohlc_file, key, get_ohlc_cache_path(symbol, cache_key))
+
+
+def write_ohlc_cache(symbol: str, cache_key: str, df: pd.DataFrame):
+    """Write OHLC DataFrame to cache (memory now, Parquet in the background)"""
+    df = df.copy()
+    with _CACHE_LOCK:
+        _MEM_CACHE[(symbol, f"ohlc_{cache_key}")] = (df, time.monotonic() + CACHE_DURATION_MINUTES_OHLC * 60)
+    
+    _run_in_background(_write_ohlc_file, get_ohlc_cache_path(symbol, cache_key), df)
+
+
+def clear_memory_cache(symbol: Optional[str] = None):
+    """Drop in-memory cache entries (all, or for one symbol)"""
+    with _CACHE_LOCK:
+        if symbol is None:
+            _MEM_CACHE.clear()
+        else:
+            for key in [k for k in _MEM_CACHE if k[0] == symbol]:
+                del _MEM_CACHE[key]
 
 
 def fuzzy_search_symbol(query: str, limit: int = 10) -> List[Dict]:
     """Enhanced fuzzy search for stock symbols - searches both symbols and company names"""
-    query_upper = query.upper().replace("-", "").replace(" ", "")
-    query_lower = query.lower()
+    # Copies, so callers can't mutate the memoized results
+    return [dict(r) for r in _fuzzy_search_cached(query.lower(), limit)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _fuzzy_search_cached(query_lower: str, limit: int) -> Tuple[Dict, ...]:
+    """Memoized search core - cleared in fetch_symbol_on_demand when a symbol is added"""
+    query_upper = query_lower.upper().replace("-", "").replace(" ", "")
     
-    results = []
+    by_symbol = {}
     
     # Try exact match first
-    if query_upper in COMMON_SYMBOLS:
-        return [{
+    if query_upper in COMMON_SYMBOLS_SET:
+        return ({
             "symbol": query_upper,
             "name": COMPANY_NAMES.get(query_upper, query_upper),
             "match_score": 100,
             "source": "known"
-        }]
+        },)
     
     # Check dynamic symbols cache
     if query_upper in DYNAMIC_SYMBOLS:
-        return [{
+        return ({
             "symbol": query_upper,
             "name": DYNAMIC_SYMBOLS[query_upper].get("name", query_upper),
             "match_score": 100,
             "source": "dynamic"
-        }]
+        },)
+    
+    # Prefix fast path (autocomplete: "AAP" -> AAPL, "MICRO" -> MSFT) - no fuzzy scan
+    prefix_results = []
+    for symbol in SYMBOL_TRIE.search(query_upper):
+        prefix_results.append({
+            "symbol": symbol,
+            "name": COMPANY_NAMES.get(symbol, symbol),
+            "match_score": 100,
+            "source": "prefix_match"
+        })
+    if len(prefix_results) < limit:
+        seen = {r["symbol"] for r in prefix_results}
+        for symbol in NAME_TRIE.search(query_upper):
+            if symbol not in seen:
+                seen.add(symbol)
+                prefix_results.append({
+                    "symbol": symbol,
+                    "name": COMPANY_NAMES.get(symbol, symbol),
+                    "match_score": 90,
+                    "source": "name_prefix_match"
+                })
+    if prefix_results:
+        return tuple(prefix_results[:limit])
     
-    # Fuzzy matching on symbols
-    symbol_matches = process.extract(query_upper, COMMON_SYMBOLS, scorer=fuzz.ratio, limit=limit)
+    # Fuzzy matching on symbols (already uppercase - no per-candidate processing)
+    symbol_matches = process.extract(
+        query_upper, COMMON_SYMBOLS_TUPLE, scorer=fuzz.ratio, processor=None, score_cutoff=40, limit=limit
+    )
     
-    for symbol, score in symbol_matches:
+    for symbol, score, _ in symbol_matches:
+        score = round(score)
         if score > 40:
-            results.append({
+            by_symbol[symbol] = {
                 "symbol": symbol,
                 "name": COMPANY_NAMES.get(symbol, symbol),
                 "match_score": score,
                 "source": "symbol_match"
-            })
+            }
     
     # Fuzzy matching on company names
-    name_to_symbol = {v.lower(): k for k, v in COMPANY_NAMES.items()}
-    company_names = list(name_to_symbol.keys())
+    name_matches = process.extract(
+        default_process(query_lower), _COMPANY_NAMES_PROCESSED,
+        scorer=fuzz.partial_ratio, processor=None, score_cutoff=50, limit=limit
+    )
     
-    name_matches = process.extract(query_lower, company_names, scorer=fuzz.partial_ratio, limit=limit)
-    
-    for name, score in name_matches:
+    for _, score, index in name_matches:
+        score = round(score)
         if score > 50:
-            symbol = name_to_symbol[name]
-            # Avoid duplicates
-            existing = next((r for r in results if r["symbol"] == symbol), None)
+            symbol = _NAME_TO_SYMBOL[_COMPANY_NAMES_LOWER[index]]
+            # Avoid duplicates (O(1) by symbol)
+            existing = by_symbol.get(symbol)
             if existing:
                 existing["match_score"] = max(existing["match_score"], score)
             else:
-                results.append({
+                by_symbol[symbol] = {
                     "symbol": symbol,
                     "name": COMPANY_NAMES.get(symbol, symbol),
                     "match_score": score,
                     "source": "name_match"
-                })
+                }
     
-    # Sort by score descending
-    results.sort(key=lambda x: x["match_score"], reverse=True)
+    # Sort by score descending (stable - insertion order breaks ties, as before)
+    results = sorted(by_symbol.values(), key=lambda x: x["match_score"], reverse=True)
     
-    return results[:limit]
+    return tuple(results[:limit])
+
+
+def _register_symbol(symbol: str, company_name: str):
+    """Add a new symbol to every search structure incrementally (caller holds _SYMBOLS_LOCK)"""
+    global COMMON_SYMBOLS_TUPLE
+    COMMON_SYMBOLS_SET.add(symbol)
+    COMMON_SYMBOLS_TUPLE = COMMON_SYMBOLS_TUPLE + (symbol,)
+    COMPANY_NAMES[symbol] = company_name
+    index_symbol(symbol, company_name)
+    name_lower = company_name.lower()
+    if name_lower not in _NAME_TO_SYMBOL:
+        _COMPANY_NAMES_LOWER.append(name_lower)
+        _COMPANY_NAMES_PROCESSED.append(default_process(name_lower))
+    _NAME_TO_SYMBOL[name_lower] = symbol
+    _fuzzy_search_cached.cache_clear()
 
 
 async def fetch_symbol_on_demand(symbol: str) -> Dict[str, Any]:
@@ -233,14 +467,21 @@ async def fetch_symbol_on_demand(symbol: str) -> Dict[str, Any]:
     logger.info(f"Fetching on-demand data for {symbol}")
     
     try:
-        ticker = yf.Ticker(symbol)
+        ticker = yf.Ticker(symbol, session=POOL.session)
+        
+        def _last_price():
+            try:
+                return ticker.fast_info.get('last_price')
+            except Exception:
+                return None  # fast_info raises on some delisted symbols
         
-        # Get basic info
-        info = ticker.info
+        # Existence check via fast_info (light endpoint) - unknown symbols never hit .info.
+        # All yfinance calls run in a worker thread: the session's retry backoff sleeps
+        last_price = await asyncio.to_thread(_last_price)
         
-        if not info or info.get('regularMarketPrice') is None:
+        if last_price is None:
             # Try to get historical data as fallback
-            hist = ticker.history(period="5d")
+            hist = await asyncio.to_thread(ticker.history, period="5d")
             if hist.empty:
                 return {
                     "success": False,
@@ -248,6 +489,9 @@ async def fetch_symbol_on_demand(symbol: str) -> Dict[str, Any]:
                     "symbol": symbol
                 }
         
+        # Full .info only for fields fast_info doesn't carry (name, P/E, sector)
+        info = await asyncio.to_thread(lambda: ticker.info) or {}
+        
         # Get company name
         company_name = info.get('longName') or info.get('shortName') or symbol
         
@@ -257,10 +501,10 @@ async def fetch_symbol_on_demand(symbol: str) -> Dict[str, Any]:
             "fetched_at": datetime.now().isoformat()
         }
         
-        # Add to COMMON_SYMBOLS for future searches
-        if symbol not in COMMON_SYMBOLS:
-            COMMON_SYMBOLS.append(symbol)
-            COMPANY_NAMES[symbol] = company_name
+        # Add to COMMON_SYMBOLS for future searches (check-then-act under the lock)
+        async with _SYMBOLS_LOCK:
+            if symbol not in COMMON_SYMBOLS_SET:
+                _register_symbol(symbol, company_name)
         
         result = {
             "success": True,
@@ -303,6 +547,14 @@ class BaseProvider:
     ) -> pd.DataFrame:
         raise NotImplementedError
 
+    async def get_ohlc_data_batch(
+        self,
+        symbols: List[str],
+        period: str = "6mo",
+        interval: str = "1d"
+    ) -> Dict[str, pd.DataFrame]:
+        return {symbol: await self.get_ohlc_data(symbol, period, interval) for symbol in dict.fromkeys(symbols)}
+
     async def get_current_price(self, symbol: str) -> Dict:
         raise NotImplementedError
 
@@ -319,63 +571,25 @@ class YahooFinanceProvider(BaseProvider):
         try:
             # Check cache first (1 MINUTE for live data)
             cache_key = f"{period}_{interval}"
-            cached = read_cache(symbol, f"ohlc_{cache_key}")
+            cached = await read_ohlc_cache(symbol, cache_key)
             
-            if cached:
-                # Validate cache age (1 minute max)
-                cached_time = datetime.fromisoformat(cached.get('cached_at', '2000-01-01'))
-                age_minutes = (datetime.now() - cached_time).total_seconds() / 60
-                
-                if age_minutes < CACHE_DURATION_MINUTES_OHLC:
-                    logger.info(f"✅ Using cached OHLC data for {symbol} (age: {age_minutes:.1f} min)")
-                    df = pd.DataFrame(cached['data'])
-                    df['date'] = pd.to_datetime(df['date'])
-                    return df
-                else:
-                    logger.info(f"🔄 Cache expired ({age_minutes:.1f} min old), fetching fresh data...")
+            if cached is not None:
+                logger.info(f"✅ Using cached OHLC data for {symbol}")
+                return cached
             
             logger.info(f"📊 Fetching FRESH OHLC data for {symbol}")
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            ticker = yf.Ticker(symbol, session=POOL.session)
+            # Blocking HTTP (with the session's sleeping retry backoff) - off the event loop
+            df = await asyncio.to_thread(ticker.history, period=period, interval=interval)
             
             if df.empty:
                 logger.warning(f"No data returned for {symbol}")
                 return pd.DataFrame()
             
-            # **CRITICAL FIX**: Remove duplicate timestamps (index duplicates)
-            # This happens especially with 1h/4h intervals from Yahoo Finance
-            if df.index.duplicated().any():
-                duplicates_count = df.index.duplicated().sum()
-                logger.warning(f"⚠️ Found {duplicates_count} duplicate timestamps for {symbol} - removing...")
-                df = df[~df.index.duplicated(keep='first')]
-                logger.info(f"✅ Cleaned data: {len(df)} unique timestamps remaining")
-            
-            df = df.reset_index()
-            df.columns = [col.lower().replace(' ', '_') for col in df.columns]
-            
-            if 'date' not in df.columns and 'datetime' in df.columns:
-                df = df.rename(columns={'datetime': 'date'})
-            
-            # **TIMEZONE FIX**: Ensure timezone-naive datetime for consistent Unix timestamps
-            # Convert to UTC and remove timezone info to avoid conversion issues
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                if df['date'].dt.tz is not None:
-                    # Convert to UTC and remove timezone
-                    df['date'] = df['date'].dt.tz_convert('UTC').dt.tz_localize(None)
-                    logger.info(f"✅ Converted {symbol} timestamps to timezone-naive UTC")
+            df = self._normalize_ohlc(symbol, df)
             
             # Cache the data
-            cache_data = {
-                'data': df.to_dict('records'),
-                'cached_at': datetime.now().isoformat()
-            }
-            # Convert datetime to string for JSON serialization
-            for record in cache_data['data']:
-                if 'date' in record and hasattr(record['date'], 'isoformat'):
-                    record['date'] = record['date'].isoformat()
-            
-            write_cache(symbol, f"ohlc_{cache_key}", cache_data)
+            write_ohlc_cache(symbol, cache_key, df)
             logger.info(f"✅ Cached fresh data for {symbol}")
             
             return df
@@ -384,21 +598,119 @@ class YahooFinanceProvider(BaseProvider):
             logger.error(f"Error fetching Yahoo Finance data for {symbol}: {e}")
             return pd.DataFrame()
 
+    async def get_ohlc_data_batch(
+        self,
+        symbols: List[str],
+        period: str = "1y",
+        interval: str = "1d"
+    ) -> Dict[str, pd.DataFrame]:
+        """OHLC for many symbols - cache hits first, then ONE yf.download for the rest"""
+        cache_key = f"{period}_{interval}"
+        results = {}
+        missing = []
+        
+        unique_symbols = list(dict.fromkeys(symbols))
+        cached_frames = await asyncio.gather(*(read_ohlc_cache(symbol, cache_key) for symbol in unique_symbols))
+        
+        for symbol, cached in zip(unique_symbols, cached_frames):
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        if not missing:
+            return results
+        
+        logger.info(f"📊 Fetching FRESH OHLC data for {len(missing)} symbols in one batch")
+        try:
+            # ignore_tz=False: same timestamps as Ticker.history, normalized to naive UTC below
+            raw = await asyncio.to_thread(
+                yf.download,
+                tickers=missing,
+                period=period,
+                interval=interval,
+                group_by='ticker',
+                actions=True,
+                ignore_tz=False,
+                threads=True,
+                progress=False,
+                session=POOL.session
+            )
+        except Exception as e:
+            logger.error(f"Error fetching Yahoo Finance batch data: {e}")
+            raw = None
+        
+        for symbol in missing:
+            if raw is None or raw.empty or symbol not in raw.columns.get_level_values(0):
+                logger.warning(f"No data returned for {symbol}")
+                results[symbol] = pd.DataFrame()
+                continue
+            
+            # Batch frame is aligned on the union of all dates - drop the rows this symbol didn't trade
+            df = raw[symbol].dropna(how='all')
+            if df.empty:
+                logger.warning(f"No data returned for {symbol}")
+                results[symbol] = pd.DataFrame()
+                continue
+            
+            df = self._normalize_ohlc(symbol, df)
+            write_ohlc_cache(symbol, cache_key, df)
+            results[symbol] = df
+        
+        return results
+
+    @staticmethod
+    def _normalize_ohlc(symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Dedupe timestamps, lowercase columns, timezone-naive UTC 'date' column"""
+        # **CRITICAL FIX**: Remove duplicate timestamps (index duplicates)
+        # This happens especially with 1h/4h intervals from Yahoo Finance
+        if df.index.duplicated().any():
+            duplicates_count = df.index.duplicated().sum()
+            logger.warning(f"⚠️ Found {duplicates_count} duplicate timestamps for {symbol} - removing...")
+            df = df[~df.index.duplicated(keep='first')]
+            logger.info(f"✅ Cleaned data: {len(df)} unique timestamps remaining")
+        
+        df = df.reset_index()
+        df.columns = [col.lower().replace(' ', '_') for col in df.columns]
+        
+        if 'date' not in df.columns and 'datetime' in df.columns:
+            df = df.rename(columns={'datetime': 'date'})
+        
+        # **TIMEZONE FIX**: Ensure timezone-naive datetime for consistent Unix timestamps
+        # Convert to UTC and remove timezone info to avoid conversion issues
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+            if df['date'].dt.tz is not None:
+                # Convert to UTC and remove timezone
+                df['date'] = df['date'].dt.tz_convert('UTC').dt.tz_localize(None)
+                logger.info(f"✅ Converted {symbol} timestamps to timezone-naive UTC")
+        
+        return df
+
     async def get_current_price(self, symbol: str) -> Dict:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = yf.Ticker(symbol, session=POOL.session)
+            # fast_info instead of .info - only the quote fields, change computed locally.
+            # fast_info is lazy, so every field is read inside the worker thread
+            fi = await asyncio.to_thread(lambda: {
+                key: ticker.fast_info.get(key)
+                for key in ('last_price', 'previous_close', 'last_volume', 'day_high', 'day_low', 'open')
+            })
+            
+            price = _to_float(fi.get('last_price')) or 0
+            previous_close = _to_float(fi.get('previous_close')) or 0
+            change = price - previous_close if price and previous_close else 0
             
             return {
                 'symbol': symbol,
-                'price': info.get('regularMarketPrice', info.get('currentPrice', 0)),
-                'change': info.get('regularMarketChange', 0),
-                'change_percent': info.get('regularMarketChangePercent', 0),
-                'volume': info.get('regularMarketVolume', 0),
-                'high': info.get('regularMarketDayHigh', 0),
-                'low': info.get('regularMarketDayLow', 0),
-                'open': info.get('regularMarketOpen', 0),
-                'previous_close': info.get('regularMarketPreviousClose', 0)
+                'price': price,
+                'change': change,
+                'change_percent': (change / previous_close) * 100 if previous_close else 0,
+                'volume': int(fi.get('last_volume') or 0),
+                'high': _to_float(fi.get('day_high')) or 0,
+                'low': _to_float(fi.get('day_low')) or 0,
+                'open': _to_float(fi.get('open')) or 0,
+                'previous_close': previous_close
             }
         except Exception as e:
             logger.error(f"Error fetching price for {symbol}: {e}")
@@ -414,8 +726,9 @@ class YahooFinanceProvider(BaseProvider):
                 return cached
             
             logger.info(f"Fetching fresh fundamentals for {symbol}")
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = yf.Ticker(symbol, session=POOL.session)
+            # Blocking HTTP - in a worker thread so /analyze can overlap it with the indicator math
+            info = await asyncio.to_thread(lambda: ticker.info)
             
             fundamentals = {
                 'symbol': symbol,
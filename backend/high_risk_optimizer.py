@@ -3,11 +3,96 @@ Modul High-Risk Assets (SOC) - Optimizări pentru Protecția Capitalului
 Implementare conform specificațiilor pentru gestionarea activelor cu volatilitate ridicată
 """
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, NamedTuple
 
 logger = logging.getLogger(__name__)
 
 
+class TakeProfitLevel(NamedTuple):
+    take_profit: float
+    type: str
+    reference_level: float
+    reason: str
+    adjusted: bool
+
+
+class StopLossLevel(NamedTuple):
+    stop_loss: float
+    sl_atr: float
+    support: float
+    message: str
+    adjusted: bool
+
+
+def _quantize(value: Optional[float]) -> Optional[float]:
+    """Round to 4 decimals so near-identical ticks share a cache entry"""
+    return None if value is None else round(float(value), 4)
+
+
+@lru_cache(maxsize=4096)
+def _dynamic_take_profit(
+    current_price: float,
+    ema_50: float,
+    ema_200: Optional[float],
+    donchian_upper: float
+) -> TakeProfitLevel:
+    """Cached core of HighRiskOptimizer.calculate_dynamic_take_profit"""
+    
+    # Verifică dacă prețul este sub mediile mobile
+    below_ema_50 = current_price < ema_50
+    below_ema_200 = ema_200 is not None and current_price < ema_200
+    
+    if below_ema_50 or below_ema_200:
+        # Preț sub EMA - folosește rezistență intermediară
+        if below_ema_50:
+            reference_ema = ema_50
+            ema_type = "EMA 50"
+        else:
+            reference_ema = ema_200
+            ema_type = "EMA 200"
+        
+        # TP = EMA - 2% pentru confirmare
+        take_profit = reference_ema * 0.98
+        
+        reason = (
+            f"⚠️ REZISTENȚĂ INTERMEDIARĂ: Preț sub {ema_type} (${reference_ema:.2f}). "
+            f"TP ajustat la ${take_profit:.2f} (2% sub {ema_type}) pentru confirmare termen scurt."
+        )
+        
+        return TakeProfitLevel(take_profit, 'intermediate_resistance', reference_ema, reason, True)
+    
+    # Preț peste EMA - folosește rezistență istorică (Donchian)
+    take_profit = donchian_upper
+    
+    reason = (
+        f"✅ REZISTENȚĂ ISTORICĂ: Preț peste EMA 50/200. "
+        f"TP la Donchian Upper ${take_profit:.2f}."
+    )
+    
+    return TakeProfitLevel(take_profit, 'historical_resistance', donchian_upper, reason, False)
+
+
+@lru_cache(maxsize=4096)
+def _atr_based_stop_loss(current_price: float, atr: float, support: float) -> StopLossLevel:
+    """Cached core of HighRiskOptimizer.calculate_atr_based_stop_loss"""
+    
+    # Calculare SL bazat pe ATR
+    sl_atr = current_price - (1.5 * atr)
+    
+    # Verificare vs suport major
+    if sl_atr > support:
+        message = (
+            f"⚠️ Stop Loss prea strâns: SL calculat (${sl_atr:.2f}) este deasupra "
+            f"suportului major (${support:.2f}). Risc ridicat de lichidare prin zgomot de piață. "
+            f"Recomandăm SL sub suport: ${support * 0.98:.2f}"
+        )
+        return StopLossLevel(support * 0.98, sl_atr, support, message, True)  # 2% sub suport
+    
+    # SL OK
+    return StopLossLevel(sl_atr, sl_atr, support, f"SL bazat pe ATR: Preț - (1.5 * ATR) = ${sl_atr:.2f}", False)
+
+
 class HighRiskOptimizer:
     """
     Optimizator pentru active high-risk (ex: SOC, penny stocks, volatilitate ridicată)
@@ -32,50 +117,10 @@ class HighRiskOptimizer:
         - Altfel: TP = Donchian Upper (rezistență istorică)
         """
         
-        # Verifică dacă prețul este sub mediile mobile
-        below_ema_50 = current_price < ema_50
-        below_ema_200 = ema_200 is not None and current_price < ema_200
-        
-        if below_ema_50 or below_ema_200:
-            # Preț sub EMA - folosește rezistență intermediară
-            if below_ema_50:
-                reference_ema = ema_50
-                ema_type = "EMA 50"
-            else:
-                reference_ema = ema_200
-                ema_type = "EMA 200"
-            
-            # TP = EMA - 2% pentru confirmare
-            take_profit = reference_ema * 0.98
-            
-            reason = (
-                f"⚠️ REZISTENȚĂ INTERMEDIARĂ: Preț sub {ema_type} (${reference_ema:.2f}). "
-                f"TP ajustat la ${take_profit:.2f} (2% sub {ema_type}) pentru confirmare termen scurt."
-            )
-            
-            return {
-                'take_profit': take_profit,
-                'type': 'intermediate_resistance',
-                'reference_level': reference_ema,
-                'reason': reason,
-                'adjusted': True
-            }
-        else:
-            # Preț peste EMA - folosește rezistență istorică (Donchian)
-            take_profit = donchian_upper
-            
-            reason = (
-                f"✅ REZISTENȚĂ ISTORICĂ: Preț peste EMA 50/200. "
-                f"TP la Donchian Upper ${take_profit:.2f}."
-            )
-            
-            return {
-                'take_profit': take_profit,
-                'type': 'historical_resistance',
-                'reference_level': donchian_upper,
-                'reason': reason,
-                'adjusted': False
-            }
+        level = _dynamic_take_profit(
+            _quantize(current_price), _quantize(ema_50), _quantize(ema_200), _quantize(donchian_upper)
+        )
+        return level._asdict()
     
     def check_volume_divergence(
         self,
@@ -102,7 +147,7 @@ class HighRiskOptimizer:
                 'confidence_penalty': 30  # Scade Confidence Score cu 30%
             }
             
-            logger.warning(f"⚠️ Volume divergence detected: {volume_ratio:.2f}x, price +{price_change_percent:.1f}%")
+            logger.warning("⚠️ Volume divergence detected: %.2fx, price +%.1f%%", volume_ratio, price_change_percent)
             return warning
         
         return None
@@ -146,7 +191,7 @@ class HighRiskOptimizer:
                 'forced_signal': 'LIQUIDATE' if fcf < -1000000000 else 'NEUTRAL'  # -1B FCF = LIQUIDATE
             }
             
-            logger.critical(f"🛑 Financial health block triggered: FCF={fcf}, D/E={dte}")
+            logger.critical("🛑 Financial health block triggered: FCF=%s, D/E=%s", fcf, dte)
             return block
         
         return None
@@ -163,37 +208,31 @@ class HighRiskOptimizer:
         - Verificare: SL nu trebuie să fie deasupra suportului major
         """
         
-        # Calculare SL bazat pe ATR
-        sl_atr = current_price - (1.5 * atr)
+        level = _atr_based_stop_loss(_quantize(current_price), _quantize(atr), _quantize(support))
         
-        # Verificare vs suport major
-        if sl_atr > support:
+        if level.adjusted:
             warning = {
                 'type': 'STOP_LOSS_WARNING',
                 'severity': 'medium',
-                'sl_atr_based': sl_atr,
-                'support_level': support,
-                'message': (
-                    f"⚠️ Stop Loss prea strâns: SL calculat (${sl_atr:.2f}) este deasupra "
-                    f"suportului major (${support:.2f}). Risc ridicat de lichidare prin zgomot de piață. "
-                    f"Recomandăm SL sub suport: ${support * 0.98:.2f}"
-                ),
-                'recommended_sl': support * 0.98  # 2% sub suport
+                'sl_atr_based': level.sl_atr,
+                'support_level': level.support,
+                'message': level.message,
+                'recommended_sl': level.stop_loss
             }
             
-            logger.warning(f"⚠️ SL too tight: ${sl_atr:.2f} above support ${support:.2f}")
+            logger.warning("⚠️ SL too tight: $%.2f above support $%.2f", level.sl_atr, level.support)
             return {
-                'stop_loss': warning['recommended_sl'],
+                'stop_loss': level.stop_loss,
                 'warning': warning,
                 'adjusted': True
             }
         
         # SL OK
         return {
-            'stop_loss': sl_atr,
+            'stop_loss': level.stop_loss,
             'warning': None,
             'adjusted': False,
-            'reason': f"SL bazat pe ATR: Preț - (1.5 * ATR) = ${sl_atr:.2f}"
+            'reason': level.message
         }
     
     def check_earnings_proximity(
@@ -224,7 +263,7 @@ class HighRiskOptimizer:
                 'forced_confidence': 20
             }
             
-            logger.critical(f"📊 Earnings in {days_until_earnings} days - forcing WAIT signal")
+            logger.critical("📊 Earnings in %s days - forcing WAIT signal", days_until_earnings)
             return alert
         
         return None
@@ -263,7 +302,7 @@ class HighRiskOptimizer:
                 'recommended_signal': 'SELL'
             }
             
-            logger.info(f"💰 Smart Exit triggered: {profit_percent:.1f}% profit, {confidence_score}% confidence")
+            logger.info("💰 Smart Exit triggered: %.1f%% profit, %s%% confidence", profit_percent, confidence_score)
             return verdict
         
         return None
@@ -1,30 +1,116 @@
 import yfinance as yf
+from yf_session import POOL
+import asyncio
+import bisect
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from datetime import datetime
+
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Limită de request-uri Yahoo simultane (rate limiter)
+CONCURRENCY_LIMIT = 4
+
+# VIX: praguri (exclusive) -> (nivel, volatilitate ridicată)
+_VIX_THRESHOLDS = (15, 20, 30)
+_VIX_LEVELS = (
+    ("SCĂZUTĂ", False),
+    ("NORMALĂ", False),
+    ("RIDICATĂ", True),
+    ("FOARTE RIDICATĂ", True),
+)
+
+
+def vix_level(vix_value: float) -> Tuple[str, bool]:
+    """Clasificare VIX - bisect_right: 15 e deja NORMALĂ, 20 RIDICATĂ, 30 FOARTE RIDICATĂ"""
+    return _VIX_LEVELS[bisect.bisect_right(_VIX_THRESHOLDS, vix_value)]
+
+
+EARNINGS_CACHE_SECONDS = 3600  # calendarul se schimbă rar
+
+
+class AlertInputs(NamedTuple):
+    """Valorile folosite de regulile de alertă, extrase o singură dată din indicators/context"""
+    vix_high: bool
+    vix_value: Any
+    volume_exhaustion: bool
+    stoch_k: float
+    current_price: float
+    resistance: float
+    gap_size: Optional[float]
+    gap_price: Optional[float]
+    adx_regime: str
+    adx_value: Any
+
+
+# (predicat, tip, severitate, mesaj) - evaluate într-o singură trecere, în ordine
+_ALERT_RULES = (
+    (lambda a: a.vix_high, 'VOLATILITATE', 'high',
+     "Volatilitate ridicată pe piață (VIX: {vix_value}). Prudență!"),
+    (lambda a: a.volume_exhaustion, 'VOLUM', 'medium',
+     'Volum scăzut - Creșterea pe volum scăzut poate fi o capcană'),
+    (lambda a: a.stoch_k > 85, 'SUPRACUMPĂRAT', 'high',
+     "Stoch RSI extrem de ridicat ({stoch_k}%). NU cumpăra aici!"),
+    (lambda a: a.current_price >= a.resistance * 0.98, 'REZISTENȚĂ', 'medium',
+     'Preț aproape de rezistență ({resistance}). Posibil rejection sau breakout.'),
+    (lambda a: a.gap_size is not None and abs(a.gap_size) > 3, 'GAP', 'medium',
+     "Gap neacoperit de {gap_size}% la ${gap_price}"),
+    (lambda a: a.adx_regime == 'RANGING', 'PIAȚĂ LATERALĂ', 'medium',
+     "ADX sub 20 ({adx_value}) - Piață laterală, semnale nesigure"),
+)
+
 
 class MarketContext:
-    def __init__(self):
-        self.cache = {}
-        self.cache_duration = 300  # 5 minutes
+    # Class-level state: every instance shares the cache, the in-flight fetch and the rate limiter
+    cache_duration = 300  # 5 minutes
+    _CACHE: TTLCache = TTLCache(maxsize=16, ttl=cache_duration)
+    _EARNINGS_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=EARNINGS_CACHE_SECONDS)
+    _semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    _inflight: Optional[asyncio.Future] = None
+    
+    async def _fetch(self, func, *args):
+        """Rulează un apel yfinance blocant într-un thread, sub semafor"""
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
     
     async def get_context(self) -> Dict[str, Any]:
         """Get global market context (VIX, S&P 500)"""
+        # Check cache
+        context = MarketContext._CACHE.get('global')
+        if context is not None:
+            return context
+        
+        # Single-flight: concurrent misses wait for the fetch already running
+        inflight = MarketContext._inflight
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only re-raise our own cancellation; a cancelled leader just means fetch again
+                if not inflight.cancelled():
+                    raise
+            return await self.get_context()
+        
+        future = asyncio.get_running_loop().create_future()
+        MarketContext._inflight = future
         try:
-            # Check cache
-            if 'context' in self.cache:
-                cached_time = self.cache.get('timestamp', datetime.min)
-                if (datetime.now() - cached_time).seconds < self.cache_duration:
-                    return self.cache['context']
-            
-            # Fetch VIX
-            vix_data = self._get_vix()
-            
-            # Fetch S&P 500
-            sp500_data = self._get_sp500()
+            context = await self._fetch_context()
+            future.set_result(context)
+            return context
+        finally:
+            MarketContext._inflight = None
+            if not future.done():
+                future.cancel()
+    
+    async def _fetch_context(self) -> Dict[str, Any]:
+        try:
+            # Fetch VIX + S&P 500 in parallel
+            vix_data, sp500_data = await asyncio.gather(
+                self._fetch(self._get_vix),
+                self._fetch(self._get_sp500)
+            )
             
             context = {
                 'vix': vix_data,
@@ -33,8 +119,7 @@ class MarketContext:
             }
             
             # Update cache
-            self.cache['context'] = context
-            self.cache['timestamp'] = datetime.now()
+            MarketContext._CACHE['global'] = context
             
             return context
             
@@ -48,7 +133,7 @@ class MarketContext:
     def _get_vix(self) -> Dict[str, Any]:
         """Get VIX (Volatility Index)"""
         try:
-            vix = yf.Ticker("^VIX")
+            vix = yf.Ticker("^VIX", session=POOL.session)
             hist = vix.history(period="1d")
             
             if hist.empty:
@@ -57,18 +142,7 @@ class MarketContext:
             vix_value = float(hist['Close'].iloc[-1])
             
             # VIX interpretation
-            if vix_value < 15:
-                level = "SCĂZUTĂ"
-                high_vol = False
-            elif vix_value < 20:
-                level = "NORMALĂ"
-                high_vol = False
-            elif vix_value < 30:
-                level = "RIDICATĂ"
-                high_vol = True
-            else:
-                level = "FOARTE RIDICATĂ"
-                high_vol = True
+            level, high_vol = vix_level(vix_value)
             
             return {
                 'value': round(vix_value, 2),
@@ -82,7 +156,7 @@ class MarketContext:
     def _get_sp500(self) -> Dict[str, Any]:
         """Get S&P 500 trend"""
         try:
-            sp500 = yf.Ticker("^GSPC")
+            sp500 = yf.Ticker("^GSPC", session=POOL.session)
             hist = sp500.history(period="5d")
             
             if len(hist) < 2:
@@ -104,6 +178,25 @@ class MarketContext:
             logger.error(f"S&P 500 fetch error: {str(e)}")
             return {'trend': 'unknown', 'change_percent': 0}
     
+    def _get_calendar(self, symbol: str):
+        """Get earnings calendar (blocking)"""
+        return yf.Ticker(symbol, session=POOL.session).calendar
+    
+    async def has_upcoming_earnings(self, symbol: str) -> bool:
+        """Earnings check (simplified - would need external API for real data), cached per symbol"""
+        cached = MarketContext._EARNINGS_CACHE.get(symbol)
+        if cached is not None:
+            return cached
+        
+        try:
+            calendar = await self._fetch(self._get_calendar, symbol)
+            flag = calendar is not None and 'Earnings Date' in calendar
+        except Exception:
+            return False
+        
+        MarketContext._EARNINGS_CACHE[symbol] = flag
+        return flag
+    
     async def check_alerts(
         self,
         symbol: str,
@@ -111,73 +204,37 @@ class MarketContext:
         context: Dict[str, Any]
     ) -> List[Dict[str, str]]:
         """Check for various alerts"""
-        alerts = []
+        vix = context.get('vix', {})
+        vix_high = vix.get('high_volatility')
+        gaps = indicators['gaps']
+        recent_gap = gaps[-1] if gaps else None
+        adx = indicators['adx']
         
-        # Volatility alert
-        if context.get('vix', {}).get('high_volatility'):
-            alerts.append({
-                'type': 'VOLATILITATE',
-                'severity': 'high',
-                'message': f"Volatilitate ridicată pe piață (VIX: {context['vix']['value']}). Prudență!"
-            })
+        inputs = AlertInputs(
+            vix_high=vix_high,
+            vix_value=vix['value'] if vix_high else None,
+            volume_exhaustion=indicators['volume']['exhaustion'],
+            stoch_k=indicators['stoch_rsi']['k'],
+            current_price=indicators['price']['current'],
+            resistance=indicators['pivots']['resistance'],
+            gap_size=recent_gap['gap_size'] if recent_gap else None,
+            gap_price=recent_gap['gap_price'] if recent_gap else None,
+            adx_regime=adx['regime'],
+            adx_value=adx['value']
+        )
+        values = inputs._asdict()
         
-        # Volume exhaustion
-        if indicators['volume']['exhaustion']:
-            alerts.append({
-                'type': 'VOLUM',
-                'severity': 'medium',
-                'message': 'Volum scăzut - Creșterea pe volum scăzut poate fi o capcană'
-            })
+        alerts = [
+            {'type': alert_type, 'severity': severity, 'message': message.format(**values)}
+            for predicate, alert_type, severity, message in _ALERT_RULES
+            if predicate(inputs)
+        ]
         
-        # Stoch RSI extreme
-        if indicators['stoch_rsi']['k'] > 85:
+        if await self.has_upcoming_earnings(symbol):
             alerts.append({
-                'type': 'SUPRACUMPĂRAT',
+                'type': 'EARNINGS',
                 'severity': 'high',
-                'message': f"Stoch RSI extrem de ridicat ({indicators['stoch_rsi']['k']}%). NU cumpăra aici!"
+                'message': 'Raport financiar programat în curând. Risc de volatilitate mare!'
             })
         
-        # Price vs resistance
-        current_price = indicators['price']['current']
-        resistance = indicators['pivots']['resistance']
-        
-        if current_price >= resistance * 0.98:
-            alerts.append({
-                'type': 'REZISTENȚĂ',
-                'severity': 'medium',
-                'message': f'Preț aproape de rezistență ({resistance}). Posibil rejection sau breakout.'
-            })
-        
-        # Gaps
-        if indicators['gaps']:
-            recent_gap = indicators['gaps'][-1]
-            if abs(recent_gap['gap_size']) > 3:
-                alerts.append({
-                    'type': 'GAP',
-                    'severity': 'medium',
-                    'message': f"Gap neacoperit de {recent_gap['gap_size']}% la ${recent_gap['gap_price']}"
-                })
-        
-        # Ranging market
-        if indicators['adx']['regime'] == 'RANGING':
-            alerts.append({
-                'type': 'PIAȚĂ LATERALĂ',
-                'severity': 'medium',
-                'message': f"ADX sub 20 ({indicators['adx']['value']}) - Piață laterală, semnale nesigure"
-            })
-        
-        # Earnings check (simplified - would need external API for real data)
-        # This is a placeholder
-        try:
-            ticker = yf.Ticker(symbol)
-            calendar = ticker.calendar
-            if calendar is not None and 'Earnings Date' in calendar:
-                alerts.append({
-                    'type': 'EARNINGS',
-                    'severity': 'high',
-                    'message': 'Raport financiar programat în curând. Risc de volatilitate mare!'
-                })
-        except:
-            pass
-        
-        return alerts
\ No newline at end of file
+        return alerts
@@ -0,0 +1,25 @@
+"""
+Numba Compatibility Module
+Optional JIT compilation - falls back to plain Python when numba is not installed
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit (supports @njit and @njit(...))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+    logger.info("numba not installed - JIT kernels run as plain Python / NumPy fallbacks")
@@ -4,11 +4,17 @@ Calculates optimal entry price for better Risk/Reward ratio (target: R/R >= 2.0)
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
 
+from numba_compat import njit, prange, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+# Candidate pullback levels and how far below price each must be (2% / 5% / 3%)
+ENTRY_LEVELS = ('EMA 20', 'EMA 50', 'Support Pivot')
+ENTRY_THRESHOLDS = np.array([0.98, 0.95, 0.97])
+
 
 class EntryOptimizer:
     """Optimizes entry price to achieve target R/R ratio"""
@@ -47,45 +53,157 @@ class EntryOptimizer:
         """
         # If current R/R is already good, no optimization needed
         if current_rr >= self.target_rr:
-            return {
-                'optimized': False,
-                'current_rr': round(current_rr, 2),
-                'message': f'R/R actual ({current_rr:.2f}) este deja favorabil. Nu este necesară optimizare.',
-                'ideal_entry': current_price,
-                'ideal_sl': current_price - (atr * 1.5),
-                'ideal_tp': resistance,
-                'ideal_rr': current_rr
-            }
+            return self._already_favorable(current_price, resistance, atr, current_rr)
+        
+        # Usual case: levels stacked EMA 20 -> pivot -> EMA 50 below price
+        d20 = (current_price - ema_20) / current_price * 100
+        d_support = (current_price - support) / current_price * 100
+        d50 = (current_price - ema_50) / current_price * 100
+        if d20 <= d_support < d50:
+            return self._optimize_stacked(
+                current_price, ema_20, ema_50, support, resistance, atr, current_rr, d20, d_support, d50
+            )
+        
+        level, ideal_entry, ideal_sl, ideal_rr, distance, reached = (
+            v[0] for v in _evaluate(
+                np.array([current_price], dtype=np.float64),
+                np.array([ema_20], dtype=np.float64),
+                np.array([ema_50], dtype=np.float64),
+                np.array([support], dtype=np.float64),
+                np.array([resistance], dtype=np.float64),
+                np.array([atr], dtype=np.float64),
+                self.target_rr
+            )
+        )
+        
+        return self._build_result(
+            current_price, support, resistance, atr, current_rr,
+            int(level), float(ideal_entry), float(ideal_sl), float(ideal_rr), float(distance), bool(reached)
+        )
+    
+    def _optimize_stacked(
+        self,
+        current_price: float,
+        ema_20: float,
+        ema_50: float,
+        support: float,
+        resistance: float,
+        atr: float,
+        current_rr: float,
+        d20: float,
+        d_support: float,
+        d50: float
+    ) -> Dict[str, Any]:
+        """Scalar path when candidates are already in distance order - returns on the first viable level"""
+        closest = None
+        
+        for level, price, threshold, distance in (
+            (0, ema_20, 0.98, d20),
+            (2, support, 0.97, d_support),
+            (1, ema_50, 0.95, d50)
+        ):
+            if not price < current_price * threshold:
+                continue
+            
+            if closest is None:
+                closest = (level, price, distance)
+            
+            sl = price - (atr * 1.5)
+            if sl <= 0.01:
+                sl = price * 0.97
+            risk = price - sl
+            if risk > 0:
+                rr = (resistance - price) / risk
+                if rr >= self.target_rr:
+                    return self._build_result(
+                        current_price, support, resistance, atr, current_rr,
+                        level, price, sl, rr, distance, True
+                    )
+        
+        if closest is None:
+            return self._build_result(
+                current_price, support, resistance, atr, current_rr,
+                -1, 0.0, 0.0, 0.0, 0.0, False
+            )
+        
+        # Closest level with the plain ATR stop
+        level, price, distance = closest
+        sl = price - (atr * 1.5)
+        risk = price - sl
+        rr = (resistance - price) / risk if risk > 0 else 0.0
+        return self._build_result(
+            current_price, support, resistance, atr, current_rr,
+            level, price, sl, rr, distance, False
+        )
+    
+    def optimize_entry_batch(
+        self,
+        current_price: np.ndarray,
+        ema_20: np.ndarray,
+        ema_50: np.ndarray,
+        support: np.ndarray,
+        resistance: np.ndarray,
+        atr: np.ndarray,
+        current_rr: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized optimize_entry for N symbols at once (arrays of shape (N,))
         
-        # Find closest support level (EMA 20, EMA 50, or pivot support)
-        potential_entries = []
-        
-        # Option 1: EMA 20 (most recent support)
-        if ema_20 < current_price * 0.98:  # Only if at least 2% below
-            potential_entries.append({
-                'level': 'EMA 20',
-                'price': ema_20,
-                'distance_percent': ((current_price - ema_20) / current_price) * 100
-            })
-        
-        # Option 2: EMA 50 (stronger support)
-        if ema_50 < current_price * 0.95:  # Only if at least 5% below
-            potential_entries.append({
-                'level': 'EMA 50',
-                'price': ema_50,
-                'distance_percent': ((current_price - ema_50) / current_price) * 100
-            })
-        
-        # Option 3: Pivot support
-        if support < current_price * 0.97:  # Only if at least 3% below
-            potential_entries.append({
-                'level': 'Support Pivot',
-                'price': support,
-                'distance_percent': ((current_price - support) / current_price) * 100
-            })
+        Returns:
+            List of N dicts, same format as optimize_entry
+        """
+        arrays = [
+            np.asarray(a, dtype=np.float64)
+            for a in (current_price, ema_20, ema_50, support, resistance, atr, current_rr)
+        ]
+        current_price, ema_20, ema_50, support, resistance, atr, current_rr = arrays
+        
+        level, ideal_entry, ideal_sl, ideal_rr, distance, reached = _evaluate(
+            current_price, ema_20, ema_50, support, resistance, atr, self.target_rr
+        )
+        
+        results = []
+        for i in range(len(current_price)):
+            if current_rr[i] >= self.target_rr:
+                results.append(self._already_favorable(float(current_price[i]), float(resistance[i]), float(atr[i]), float(current_rr[i])))
+                continue
+            
+            results.append(self._build_result(
+                float(current_price[i]), float(support[i]), float(resistance[i]), float(atr[i]), float(current_rr[i]),
+                int(level[i]), float(ideal_entry[i]), float(ideal_sl[i]), float(ideal_rr[i]), float(distance[i]), bool(reached[i])
+            ))
+        
+        return results
+    
+    def _already_favorable(self, current_price: float, resistance: float, atr: float, current_rr: float) -> Dict[str, Any]:
+        return {
+            'optimized': False,
+            'current_rr': round(current_rr, 2),
+            'message': f'R/R actual ({current_rr:.2f}) este deja favorabil. Nu este necesară optimizare.',
+            'ideal_entry': current_price,
+            'ideal_sl': current_price - (atr * 1.5),
+            'ideal_tp': resistance,
+            'ideal_rr': current_rr
+        }
+    
+    def _build_result(
+        self,
+        current_price: float,
+        support: float,
+        resistance: float,
+        atr: float,
+        current_rr: float,
+        level: int,
+        ideal_entry: float,
+        ideal_sl: float,
+        ideal_rr: float,
+        distance: float,
+        reached: bool
+    ) -> Dict[str, Any]:
+        """Package the evaluated candidate into the response dict"""
         
         # If no potential entries, price is already at/below support
-        if not potential_entries:
+        if level < 0:
             return {
                 'optimized': False,
                 'current_rr': round(current_rr, 2),
@@ -97,59 +215,20 @@ class EntryOptimizer:
                 'ideal_rr': current_rr
             }
         
-        # Sort by closest to current price (most realistic pullback)
-        potential_entries.sort(key=lambda x: x['distance_percent'])
-        
-        # Try each entry level until we find one with R/R >= target
-        best_entry = None
-        
-        for entry_option in potential_entries:
-            ideal_entry = entry_option['price']
-            ideal_sl = ideal_entry - (atr * 1.5)  # Standard 1.5x ATR stop
-            ideal_tp = resistance  # Target is resistance
-            
-            # Ensure SL is positive
-            if ideal_sl <= 0.01:
-                ideal_sl = ideal_entry * 0.97  # 3% stop as fallback
-            
-            # Calculate R/R
-            risk = ideal_entry - ideal_sl
-            reward = ideal_tp - ideal_entry
-            
-            if risk > 0:
-                ideal_rr = reward / risk
-                
-                if ideal_rr >= self.target_rr:
-                    best_entry = {
-                        'level': entry_option['level'],
-                        'price': ideal_entry,
-                        'distance_percent': entry_option['distance_percent'],
-                        'sl': ideal_sl,
-                        'tp': ideal_tp,
-                        'rr': ideal_rr
-                    }
-                    break
+        level_name = ENTRY_LEVELS[level]
         
         # If no entry achieves target R/R, use the closest one and warn
-        if not best_entry:
-            closest = potential_entries[0]
-            ideal_entry = closest['price']
-            ideal_sl = ideal_entry - (atr * 1.5)
-            ideal_tp = resistance
-            risk = ideal_entry - ideal_sl
-            reward = ideal_tp - ideal_entry
-            ideal_rr = reward / risk if risk > 0 else 0
-            
+        if not reached:
             return {
                 'optimized': True,
                 'current_rr': round(current_rr, 2),
                 'ideal_entry': round(ideal_entry, 2),
                 'ideal_sl': round(ideal_sl, 2),
-                'ideal_tp': round(ideal_tp, 2),
+                'ideal_tp': round(resistance, 2),
                 'ideal_rr': round(ideal_rr, 2),
-                'entry_level': closest['level'],
-                'pullback_distance': round(closest['distance_percent'], 1),
-                'message': f'Intrare Optimizată la {closest["level"]} (${ideal_entry:.2f}) - pullback {closest["distance_percent"]:.1f}%',
+                'entry_level': level_name,
+                'pullback_distance': round(distance, 1),
+                'message': f'Intrare Optimizată la {level_name} (${ideal_entry:.2f}) - pullback {distance:.1f}%',
                 'warning': f'R/R îmbunătățit la {ideal_rr:.2f} dar încă sub target {self.target_rr}. Rezistența este prea apropiată.',
                 'action': f'Setați Limit Order la ${ideal_entry:.2f} și așteptați retragerea.'
             }
@@ -158,13 +237,153 @@ class EntryOptimizer:
         return {
             'optimized': True,
             'current_rr': round(current_rr, 2),
-            'ideal_entry': round(best_entry['price'], 2),
-            'ideal_sl': round(best_entry['sl'], 2),
-            'ideal_tp': round(best_entry['tp'], 2),
-            'ideal_rr': round(best_entry['rr'], 2),
-            'entry_level': best_entry['level'],
-            'pullback_distance': round(best_entry['distance_percent'], 1),
-            'message': f'Intrare Optimă la {best_entry["level"]} (${best_entry["price"]:.2f}) - pullback {best_entry["distance_percent"]:.1f}%',
+            'ideal_entry': round(ideal_entry, 2),
+            'ideal_sl': round(ideal_sl, 2),
+            'ideal_tp': round(resistance, 2),
+            'ideal_rr': round(ideal_rr, 2),
+            'entry_level': level_name,
+            'pullback_distance': round(distance, 1),
+            'message': f'Intrare Optimă la {level_name} (${ideal_entry:.2f}) - pullback {distance:.1f}%',
             'success': True,
-            'action': f'Setați Limit Order la ${best_entry["price"]:.2f}. R/R devine {best_entry["rr"]:.2f}:1 ✅'
+            'action': f'Setați Limit Order la ${ideal_entry:.2f}. R/R devine {ideal_rr:.2f}:1 ✅'
         }
+
+
+def _evaluate_candidates(
+    current_price: np.ndarray,
+    ema_20: np.ndarray,
+    ema_50: np.ndarray,
+    support: np.ndarray,
+    resistance: np.ndarray,
+    atr: np.ndarray,
+    target_rr: float
+):
+    """
+    Evaluate the EMA 20 / EMA 50 / pivot support candidates for N symbols at once
+    
+    Returns:
+        (level, ideal_entry, ideal_sl, ideal_rr, distance_percent, reached) arrays of shape (N,);
+        level is the index into ENTRY_LEVELS or -1 when no candidate is below price
+    """
+    # Shape (N, 3): one column per candidate level
+    prices = np.stack([ema_20, ema_50, support], axis=1)
+    cp = current_price[:, None]
+    
+    # Only levels sufficiently below the current price are valid pullbacks
+    mask = prices < cp * ENTRY_THRESHOLDS
+    distance = (cp - prices) / cp * 100
+    
+    reward = resistance[:, None] - prices
+    sl = prices - atr[:, None] * 1.5  # Standard 1.5x ATR stop
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Candidates that reach target R/R (SL falls back to 3% when not positive)
+        sl_checked = np.where(sl <= 0.01, prices * 0.97, sl)
+        risk = prices - sl_checked
+        rr = np.where(risk > 0, reward / risk, -np.inf)
+        
+        # Closest candidate fallback uses the plain ATR stop
+        risk_plain = prices - sl
+        rr_plain = np.where(risk_plain > 0, reward / risk_plain, 0.0)
+    
+    ok = mask & (rr >= target_rr)
+    reached = ok.any(axis=1)
+    
+    # Closest (smallest pullback) level among the qualifying ones
+    best = np.argmin(np.where(ok, distance, np.inf), axis=1)
+    closest = np.argmin(np.where(mask, distance, np.inf), axis=1)
+    idx = np.where(reached, best, closest)
+    
+    rows = np.arange(len(current_price))
+    level = np.where(mask.any(axis=1), idx, -1)
+    ideal_entry = prices[rows, idx]
+    ideal_sl = np.where(reached, sl_checked[rows, idx], sl[rows, idx])
+    ideal_rr = np.where(reached, rr[rows, idx], rr_plain[rows, idx])
+    
+    return level, ideal_entry, ideal_sl, ideal_rr, distance[rows, idx], reached
+
+
+@njit(parallel=True, cache=True)
+def _optimize_entry_kernel(current, ema20, ema50, support, resistance, atr, target_rr):
+    """JIT version of _evaluate_candidates - one parallel iteration per symbol"""
+    n = current.shape[0]
+    level = np.full(n, -1, dtype=np.int64)
+    ideal_entry = np.empty(n, dtype=np.float64)
+    ideal_sl = np.empty(n, dtype=np.float64)
+    ideal_rr = np.empty(n, dtype=np.float64)
+    distance = np.empty(n, dtype=np.float64)
+    reached = np.zeros(n, dtype=np.bool_)
+    
+    for i in prange(n):
+        cp = current[i]
+        best = -1
+        closest = -1
+        best_dist = 0.0
+        closest_dist = 0.0
+        
+        for j in range(3):
+            if j == 0:
+                price = ema20[i]
+                threshold = 0.98
+            elif j == 1:
+                price = ema50[i]
+                threshold = 0.95
+            else:
+                price = support[i]
+                threshold = 0.97
+            
+            if not price < cp * threshold:
+                continue
+            
+            dist = (cp - price) / cp * 100
+            if closest < 0 or dist < closest_dist:
+                closest = j
+                closest_dist = dist
+            
+            sl = price - atr[i] * 1.5
+            if sl <= 0.01:
+                sl = price * 0.97
+            risk = price - sl
+            if risk > 0 and (resistance[i] - price) / risk >= target_rr:
+                if best < 0 or dist < best_dist:
+                    best = j
+                    best_dist = dist
+        
+        if closest < 0:
+            # Same fill values as the NumPy path (first candidate)
+            idx = 0
+        elif best >= 0:
+            idx = best
+            reached[i] = True
+        else:
+            idx = closest
+        
+        if idx == 0:
+            price = ema20[i]
+        elif idx == 1:
+            price = ema50[i]
+        else:
+            price = support[i]
+        
+        sl = price - atr[i] * 1.5
+        if reached[i] and sl <= 0.01:
+            sl = price * 0.97
+        risk = price - sl
+        
+        if closest >= 0:
+            level[i] = idx
+        ideal_entry[i] = price
+        ideal_sl[i] = sl
+        ideal_rr[i] = (resistance[i] - price) / risk if risk > 0 else 0.0
+        distance[i] = (cp - price) / cp * 100
+    
+    return level, ideal_entry, ideal_sl, ideal_rr, distance, reached
+
+
+if NUMBA_AVAILABLE:
+    _evaluate = _optimize_entry_kernel
+    # Pre-touch the JIT so the first scan does not pay the compilation cost
+    _warm = np.ones(1, dtype=np.float64)
+    _evaluate(_warm, _warm, _warm, _warm, _warm, _warm, 2.0)
+else:
+    _evaluate = _evaluate_candidates
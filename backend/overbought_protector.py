@@ -3,10 +3,37 @@ Modul Overbought Assets (REAL) - Protecție pentru Active Supracumpărate
 Implementare conform specificațiilor pentru gestionarea zonelor de risc extrem
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+from protect_math import trailing_stop, profit_percent
 
 logger = logging.getLogger(__name__)
 
+# Mesaje pre-construite (formatate o singură dată, doar când sunt folosite)
+_SELL_TRIGGER_MSG = (
+    "🔴 SELL_TRIGGER ACTIVAT: Zone de OVERBOUGHT EXTREM! "
+    "RSI={rsi:.1f} (>{rsi_th}), "
+    "Stoch RSI={stoch:.1f}% (>{stoch_th}%), "
+    "Volum={vol:.2f}x (<{vol_min}x). "
+    "Combinația este TOXICĂ: Supracumpărare + Lipsă de cumpărători noi. "
+    "🎯 ACȚIUNE: TAKE PROFIT NOW - SELL înainte de corecție."
+)
+_TRAILING_MSG = (
+    "📍 TRAILING STOP: ${stop:.2f} "
+    "(Distanță: {distance:.1f}%). "
+    "Bazat pe volatilitatea pieței (2*ATR = ${atr2:.2f}). "
+    "Actualizează automat când prețul crește."
+)
+_EARNINGS_MSG = (
+    "🛡️ EARNINGS AUTO-PROTECT: Raport în {days} zile! "
+    "Poziție pe profit: +{profit:.1f}%. "
+    "🔒 ACȚIUNE AUTOMATĂ: Mutăm Stop Loss la BREAKEVEN (${entry:.2f}) "
+    "pentru protecție în caz de gap negativ. "
+    "💡 RECOMANDARE: Scoateți 50% din poziție ACUM și lăsați restul să ruleze."
+)
+
 
 class OverboughtProtector:
     """
@@ -24,7 +51,8 @@ class OverboughtProtector:
         self,
         rsi: float,
         stoch_rsi_k: float,
-        volume_ratio: float
+        volume_ratio: float,
+        build_message: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         SELL_TRIGGER Automat:
@@ -45,14 +73,11 @@ class OverboughtProtector:
                 'rsi': rsi,
                 'stoch_rsi_k': stoch_rsi_k,
                 'volume_ratio': volume_ratio,
-                'message': (
-                    f"🔴 SELL_TRIGGER ACTIVAT: Zone de OVERBOUGHT EXTREM! "
-                    f"RSI={rsi:.1f} (>{self.rsi_threshold}), "
-                    f"Stoch RSI={stoch_rsi_k:.1f}% (>{self.stoch_rsi_threshold}%), "
-                    f"Volum={volume_ratio:.2f}x (<{self.volume_ratio_min}x). "
-                    f"Combinația este TOXICĂ: Supracumpărare + Lipsă de cumpărători noi. "
-                    f"🎯 ACȚIUNE: TAKE PROFIT NOW - SELL înainte de corecție."
-                ),
+                'message': _SELL_TRIGGER_MSG.format(
+                    rsi=rsi, rsi_th=self.rsi_threshold,
+                    stoch=stoch_rsi_k, stoch_th=self.stoch_rsi_threshold,
+                    vol=volume_ratio, vol_min=self.volume_ratio_min
+                ) if build_message else None,
                 'action': 'SELL - Take Profit acum',
                 'forced_signal': 'SELL',
                 'forced_confidence': 85,
@@ -67,6 +92,33 @@ class OverboughtProtector:
         
         return None
     
+    def check_sell_trigger_batch(
+        self,
+        rsi: np.ndarray,
+        stoch_rsi_k: np.ndarray,
+        volume_ratio: np.ndarray,
+        symbols: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        check_sell_trigger pentru un portofoliu întreg (arrays de forma (N,))
+        Returnează: {symbol: trigger} doar pentru simbolurile cu SELL_TRIGGER activ
+        """
+        rsi = np.asarray(rsi, dtype=np.float64)
+        stoch_rsi_k = np.asarray(stoch_rsi_k, dtype=np.float64)
+        volume_ratio = np.asarray(volume_ratio, dtype=np.float64)
+        
+        mask = (
+            (rsi > self.rsi_threshold) &
+            (stoch_rsi_k > self.stoch_rsi_threshold) &
+            (volume_ratio < self.volume_ratio_min)
+        )
+        
+        # Dict-urile se construiesc doar pentru simbolurile declanșate
+        return {
+            symbols[i]: self.check_sell_trigger(float(rsi[i]), float(stoch_rsi_k[i]), float(volume_ratio[i]))
+            for i in np.flatnonzero(mask)
+        }
+    
     def check_entry_block(
         self,
         risk_reward_ratio: float
@@ -98,7 +150,8 @@ class OverboughtProtector:
     def calculate_trailing_stop(
         self,
         current_price: float,
-        atr: float
+        atr: float,
+        build_message: bool = True
     ) -> Dict[str, Any]:
         """
         Optimizarea Trailing Stop:
@@ -106,30 +159,28 @@ class OverboughtProtector:
         - Auto-execute (nu doar sugestie)
         """
         
-        trailing_stop = current_price - (2 * atr)
+        stop, distance_percent = trailing_stop(float(current_price), float(atr))
         
         result = {
-            'trailing_stop': trailing_stop,
+            'trailing_stop': stop,
             'formula': 'Preț - (2 * ATR)',
             'atr': atr,
-            'distance_percent': ((current_price - trailing_stop) / current_price) * 100,
-            'message': (
-                f"📍 TRAILING STOP: ${trailing_stop:.2f} "
-                f"(Distanță: {((current_price - trailing_stop) / current_price) * 100:.1f}%). "
-                f"Bazat pe volatilitatea pieței (2*ATR = ${2*atr:.2f}). "
-                f"Actualizează automat când prețul crește."
-            ),
+            'distance_percent': distance_percent,
+            'message': _TRAILING_MSG.format(
+                stop=stop, distance=distance_percent, atr2=2 * atr
+            ) if build_message else None,
             'auto_execute': True
         }
         
-        logger.info(f"📍 Trailing Stop calculated: ${trailing_stop:.2f} (2*ATR)")
+        logger.info(f"📍 Trailing Stop calculated: ${stop:.2f} (2*ATR)")
         return result
     
     def earnings_auto_protect(
         self,
         days_until_earnings: Optional[int],
         entry_price: float,
-        current_price: float
+        current_price: float,
+        build_message: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Earnings Auto-Protect:
@@ -147,20 +198,18 @@ class OverboughtProtector:
         if not is_profitable:
             return None
         
+        current_profit_percent = profit_percent(float(entry_price), float(current_price))
+        
         # PROTECȚIE AUTOMATĂ
         protect = {
             'type': 'EARNINGS_AUTO_PROTECT',
             'severity': 'high',
             'days_until': days_until_earnings,
             'breakeven_sl': entry_price,
-            'current_profit_percent': ((current_price - entry_price) / entry_price) * 100,
-            'message': (
-                f"🛡️ EARNINGS AUTO-PROTECT: Raport în {days_until_earnings} zile! "
-                f"Poziție pe profit: +{((current_price - entry_price) / entry_price) * 100:.1f}%. "
-                f"🔒 ACȚIUNE AUTOMATĂ: Mutăm Stop Loss la BREAKEVEN (${entry_price:.2f}) "
-                f"pentru protecție în caz de gap negativ. "
-                f"💡 RECOMANDARE: Scoateți 50% din poziție ACUM și lăsați restul să ruleze."
-            ),
+            'current_profit_percent': current_profit_percent,
+            'message': _EARNINGS_MSG.format(
+                days=days_until_earnings, profit=current_profit_percent, entry=entry_price
+            ) if build_message else None,
             'action_auto': f'SL mutat automat la ${entry_price:.2f} (breakeven)',
             'action_manual': 'Scoateți 50% din poziție pentru siguranță',
             'new_stop_loss': entry_price,
@@ -185,50 +234,75 @@ class OverboughtProtector:
         - Înlocuiește 'RIDICAT' cu 'EXTREM DE RIDICAT (Overbought/Earnings Risk)'
         """
         
-        # Check overbought
         is_overbought = rsi > self.rsi_threshold and stoch_rsi_k > self.stoch_rsi_threshold
-        
-        # Check earnings risk
         earnings_risk = days_until_earnings is not None and days_until_earnings <= 7
+        volume_weak = volume_ratio < self.volume_ratio_min
         
-        # Check volume weakness
+        key = (is_overbought << 2) | (earnings_risk << 1) | volume_weak
+        return dict(_RISK_TABLE[key])
+    
+    def assess_final_risk_batch(
+        self,
+        rsi: np.ndarray,
+        stoch_rsi_k: np.ndarray,
+        volume_ratio: np.ndarray,
+        days_until_earnings: np.ndarray
+    ) -> List[Dict[str, str]]:
+        """
+        assess_final_risk pentru N simboluri (days_until_earnings = NaN când nu există dată)
+        """
+        rsi = np.asarray(rsi, dtype=np.float64)
+        stoch_rsi_k = np.asarray(stoch_rsi_k, dtype=np.float64)
+        volume_ratio = np.asarray(volume_ratio, dtype=np.float64)
+        days = np.asarray(days_until_earnings, dtype=np.float64)
+        
+        is_overbought = (rsi > self.rsi_threshold) & (stoch_rsi_k > self.stoch_rsi_threshold)
+        earnings_risk = days <= 7  # NaN -> False
         volume_weak = volume_ratio < self.volume_ratio_min
         
-        # Assess risk
-        if is_overbought and (earnings_risk or volume_weak):
-            risk_level = "EXTREM DE RIDICAT"
-            risk_factors = []
-            
-            if is_overbought:
-                risk_factors.append("Overbought Extrem")
-            if earnings_risk:
-                risk_factors.append("Earnings Risk")
-            if volume_weak:
-                risk_factors.append("Volum Scăzut")
-            
-            return {
-                'level': risk_level,
-                'factors': ', '.join(risk_factors),
-                'message': f"🔴 {risk_level} ({', '.join(risk_factors)})",
-                'color': 'red',
-                'severity': 'extreme'
-            }
-        elif is_overbought or earnings_risk:
-            return {
-                'level': 'RIDICAT',
-                'factors': 'Overbought sau Earnings' if is_overbought else 'Earnings',
-                'message': f"🟡 RIDICAT ({'Overbought' if is_overbought else 'Earnings'})",
-                'color': 'yellow',
-                'severity': 'high'
-            }
-        else:
-            return {
-                'level': 'MODERAT',
-                'factors': 'Normal',
-                'message': '🟢 MODERAT (Condiții normale)',
-                'color': 'green',
-                'severity': 'moderate'
-            }
+        keys = (is_overbought.astype(np.int64) << 2) | (earnings_risk.astype(np.int64) << 1) | volume_weak
+        return [dict(_RISK_TABLE[key]) for key in keys.tolist()]
+
+
+def _risk_entry(is_overbought: bool, earnings_risk: bool, volume_weak: bool) -> Dict[str, str]:
+    """Rezultatul assess_final_risk pentru o combinație de flag-uri"""
+    if is_overbought and (earnings_risk or volume_weak):
+        risk_factors = ["Overbought Extrem"]
+        if earnings_risk:
+            risk_factors.append("Earnings Risk")
+        if volume_weak:
+            risk_factors.append("Volum Scăzut")
+        
+        return {
+            'level': "EXTREM DE RIDICAT",
+            'factors': ', '.join(risk_factors),
+            'message': f"🔴 EXTREM DE RIDICAT ({', '.join(risk_factors)})",
+            'color': 'red',
+            'severity': 'extreme'
+        }
+    elif is_overbought or earnings_risk:
+        return {
+            'level': 'RIDICAT',
+            'factors': 'Overbought sau Earnings' if is_overbought else 'Earnings',
+            'message': f"🟡 RIDICAT ({'Overbought' if is_overbought else 'Earnings'})",
+            'color': 'yellow',
+            'severity': 'high'
+        }
+    else:
+        return {
+            'level': 'MODERAT',
+            'factors': 'Normal',
+            'message': '🟢 MODERAT (Condiții normale)',
+            'color': 'green',
+            'severity': 'moderate'
+        }
+
+
+# Cheie pe 3 biți: (overbought << 2) | (earnings_risk << 1) | volume_weak
+_RISK_TABLE: Dict[int, Dict[str, str]] = {
+    key: _risk_entry(bool(key & 0b100), bool(key & 0b010), bool(key & 0b001))
+    for key in range(8)
+}
 
 
 # Global instance
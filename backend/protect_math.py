@@ -0,0 +1,17 @@
+"""
+Protect Math Module
+Nuclee numerice (JIT când numba e disponibil) pentru OverboughtProtector
+"""
+from numba_compat import njit
+
+
+@njit(cache=True)
+def trailing_stop(price, atr):
+    """Trailing Stop = Preț - (2 * ATR); întoarce (stop, distanță %)"""
+    ts = price - 2 * atr
+    return ts, (price - ts) / price * 100
+
+
+@njit(cache=True)
+def profit_percent(entry_price, current_price):
+    return (current_price - entry_price) / entry_price * 100
@@ -3,20 +3,28 @@ Reality Check Module - Validare Date Live și Sincronizare Obligatorie
 Implementat conform specificațiilor pentru prevenirea halucinațiilor de preț
 """
 import yfinance as yf
+from yf_session import POOL
+import orjson
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-import json
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
 import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 # Cache pentru validare live (1 minut)
 LIVE_CACHE_DIR = "/tmp/live_price_cache"
 LIVE_CACHE_DURATION_MINUTES = 1
+LIVE_CACHE_TTL_SECONDS = LIVE_CACHE_DURATION_MINUTES * 60
 os.makedirs(LIVE_CACHE_DIR, exist_ok=True)
 
 
+def _to_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
 class RealityCheckModule:
     """
     Modulul Reality Check asigură că datele folosite sunt REALE și ACTUALE
@@ -25,77 +33,177 @@ class RealityCheckModule:
     def __init__(self):
         self.max_price_diff_percent = 5.0  # 5% diferență maximă acceptabilă
         
+        # Cache în memorie (disk doar pentru restart) + lock per simbol pentru fetch-uri concurente
+        self._mem_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # symbol -> (monotonic expiry, data)
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._inflight_guard = threading.Lock()
+        
     def get_live_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Obține prețul LIVE direct de la Yahoo Finance (cache 1 minut)
         """
         try:
-            # Check cache (1 minut)
-            cache_path = os.path.join(LIVE_CACHE_DIR, f"{symbol}_live.json")
-            
-            if os.path.exists(cache_path):
-                file_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-                if datetime.now() - file_time < timedelta(minutes=LIVE_CACHE_DURATION_MINUTES):
-                    with open(cache_path, 'r') as f:
-                        cached_data = json.load(f)
-                        logger.info(f"✅ Using cached LIVE price for {symbol} (age: {(datetime.now() - file_time).seconds}s)")
-                        return cached_data
-            
-            # Fetch fresh live data
-            logger.info(f"🔄 Fetching FRESH live price for {symbol}...")
-            ticker = yf.Ticker(symbol)
-            
-            # Get current price
-            info = ticker.info
+            cached_data = self._read_cache(symbol)
+            if cached_data is not None:
+                return cached_data
             
-            # Try multiple price fields (Yahoo Finance can be inconsistent)
-            current_price = None
-            price_fields = ['regularMarketPrice', 'currentPrice', 'previousClose']
+            # Un singur fetch per simbol - cererile concurente așteaptă rezultatul lui
+            with self._inflight_guard:
+                lock = self._inflight.setdefault(symbol, threading.Lock())
             
-            for field in price_fields:
-                if field in info and info[field] is not None:
-                    current_price = float(info[field])
-                    break
-            
-            if current_price is None:
-                # Fallback: try historical data (last close)
-                hist = ticker.history(period="1d")
-                if not hist.empty:
-                    current_price = float(hist['Close'].iloc[-1])
-            
-            if current_price is None:
-                logger.error(f"❌ Cannot fetch live price for {symbol}")
-                return None
-            
-            live_data = {
-                'symbol': symbol,
-                'price': current_price,
-                'timestamp': datetime.now().isoformat(),
-                'source': 'yahoo_finance_live',
-                'market_open': info.get('regularMarketOpen', None),
-                'market_high': info.get('regularMarketDayHigh', None),
-                'market_low': info.get('regularMarketDayLow', None),
-                'volume': info.get('regularMarketVolume', 0),
-                'previous_close': info.get('regularMarketPreviousClose', current_price)
-            }
-            
-            # Cache the data
-            with open(cache_path, 'w') as f:
-                json.dump(live_data, f)
+            try:
+                with lock:
+                    cached_data = self._read_cache(symbol)
+                    if cached_data is not None:
+                        return cached_data
+                    
+                    # Fetch fresh live data (fast_info - endpoint ușor, fără blob-ul .info)
+                    logger.info(f"🔄 Fetching FRESH live price for {symbol}...")
+                    live_data = self._live_data_from_ticker(symbol, yf.Ticker(symbol, session=POOL.session))
+                    
+                    if live_data is None:
+                        logger.error(f"❌ Cannot fetch live price for {symbol}")
+                        return None
+                    
+                    self._write_cache(symbol, live_data)
+            finally:
+                # Drop the per-symbol lock once its fetch is over (unless a newer one replaced it)
+                with self._inflight_guard:
+                    if self._inflight.get(symbol) is lock:
+                        del self._inflight[symbol]
             
-            logger.info(f"✅ LIVE price for {symbol}: ${current_price:.2f}")
+            logger.info(f"✅ LIVE price for {symbol}: ${live_data['price']:.2f}")
             return live_data
             
         except Exception as e:
             logger.error(f"❌ Error fetching live price for {symbol}: {e}")
             return None
     
-    def validate_price(self, symbol: str, cached_price: float) -> Dict[str, Any]:
+    def get_live_prices(self, symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Obține prețurile LIVE pentru mai multe simboluri (un singur yf.Tickers pentru cele fără cache)
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        
+        for symbol in symbols:
+            cached_data = self._read_cache(symbol)
+            if cached_data is not None:
+                results[symbol] = cached_data
+            else:
+                missing.append(symbol)
+        
+        if not missing:
+            return results
+        
+        logger.info(f"🔄 Fetching FRESH live prices for {len(missing)} symbols...")
+        try:
+            tickers = yf.Tickers(" ".join(missing), session=POOL.session).tickers
+        except Exception as e:
+            logger.error(f"❌ Error fetching live prices: {e}")
+            results.update({symbol: None for symbol in missing})
+            return results
+        
+        for symbol in missing:
+            try:
+                ticker = tickers.get(symbol.upper())
+                live_data = self._live_data_from_ticker(symbol, ticker) if ticker is not None else None
+            except Exception as e:
+                logger.error(f"❌ Error fetching live price for {symbol}: {e}")
+                live_data = None
+            
+            if live_data is not None:
+                self._write_cache(symbol, live_data)
+            else:
+                logger.error(f"❌ Cannot fetch live price for {symbol}")
+            results[symbol] = live_data
+        
+        return results
+    
+    def _live_data_from_ticker(self, symbol: str, ticker) -> Optional[Dict[str, Any]]:
+        """Construiește datele live din fast_info (fallback: ultimul close din istoric)"""
+        fi = ticker.fast_info
+        
+        current_price = fi.get('last_price') or fi.get('previous_close')
+        
+        if current_price is None:
+            # Fallback: try historical data (last close)
+            hist = ticker.history(period="1d")
+            if not hist.empty:
+                current_price = hist['Close'].iloc[-1]
+        
+        if current_price is None:
+            return None
+        
+        current_price = float(current_price)
+        previous_close = _to_float(fi.get('previous_close'))
+        
+        # Conversie la tipuri Python (fast_info poate întoarce numpy scalars)
+        return {
+            'symbol': symbol,
+            'price': current_price,
+            'timestamp': datetime.now().isoformat(),
+            'source': 'yahoo_finance_live',
+            'market_open': _to_float(fi.get('open')),
+            'market_high': _to_float(fi.get('day_high')),
+            'market_low': _to_float(fi.get('day_low')),
+            'volume': int(fi.get('last_volume') or 0),
+            'previous_close': previous_close if previous_close is not None else current_price
+        }
+    
+    def _read_cache(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Citește prețul live din cache (memorie, apoi disk) dacă are sub 1 minut"""
+        entry = self._mem_cache.get(symbol)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        
+        # Disk - doar după restart, când memoria e goală (timestamp-ul e în fișier, fără stat())
+        cache_path = os.path.join(LIVE_CACHE_DIR, f"{symbol}_live.bin")
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                entry = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+        
+        # Fișierul păstrează wall-clock time; vârsta se convertește într-un expiry monotonic
+        age = time.time() - entry['ts']
+        if age < LIVE_CACHE_TTL_SECONDS:
+            logger.info(f"✅ Using cached LIVE price for {symbol} (age: {int(age)}s)")
+            self._mem_cache[symbol] = (time.monotonic() + LIVE_CACHE_TTL_SECONDS - age, entry['data'])
+            return entry['data']
+        
+        return None
+    
+    def _write_cache(self, symbol: str, live_data: Dict[str, Any]):
+        self._mem_cache[symbol] = (time.monotonic() + LIVE_CACHE_TTL_SECONDS, live_data)
+        
+        # Scriere atomică (tmp + os.replace) - cititorii nu văd niciodată un fișier parțial
+        cache_path = os.path.join(LIVE_CACHE_DIR, f"{symbol}_live.bin")
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps({'ts': time.time(), 'data': live_data}))
+        os.replace(tmp_path, cache_path)
+    
+    def clear_memory_cache(self, symbol: Optional[str] = None):
+        """Golește cache-ul în memorie (tot, sau pentru un simbol)"""
+        if symbol is None:
+            self._mem_cache.clear()
+        else:
+            self._mem_cache.pop(symbol, None)
+    
+    def validate_price(
+        self,
+        symbol: str,
+        cached_price: float,
+        live_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Validează prețul cached față de prețul LIVE
         Returnează: {valid: bool, live_price: float, diff_percent: float, error: str}
         """
-        live_data = self.get_live_price(symbol)
+        if live_data is None:
+            live_data = self.get_live_price(symbol)
         
         if live_data is None:
             return {
@@ -150,7 +258,8 @@ class RealityCheckModule:
         
         # Validare preț
         cached_price = analysis_data.get('current_price', 0)
-        price_validation = self.validate_price(symbol, cached_price)
+        live_data = self.get_live_price(symbol)
+        price_validation = self.validate_price(symbol, cached_price, live_data)
         validation_report['price_validation'] = price_validation
         
         if not price_validation['valid']:
@@ -172,7 +281,6 @@ class RealityCheckModule:
                 pass
         
         # Adaugă datele LIVE
-        live_data = self.get_live_price(symbol)
         if live_data:
             validation_report['live_data'] = live_data
         
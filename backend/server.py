@@ -1,14 +1,20 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
-from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+import asyncio
 import os
+import weakref
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
+import msgpack
+import orjson
+from cachetools import TTLCache
 import numpy as np
 import pandas as pd
 
@@ -17,8 +23,8 @@ from data_providers import (
     fuzzy_search_symbol,
     fetch_symbol_on_demand
 )
-from technical_analysis import TechnicalAnalyzer
-from risk_calculator import RiskCalculator
+from technical_analysis import TechnicalAnalyzer, warm_jit
+from analysis_pool import run_analysis, prime as prime_analysis_pool, shutdown as shutdown_analysis_pool
 from ai_analyzer import AIAnalyzer
 from market_context import MarketContext
 from reality_check import reality_check, get_live_market_data
@@ -30,22 +36,47 @@ from models import PriceAlert, WatchlistEntry, PaperTrade, StrategyStats
 import uuid
 
 
-def convert_numpy_types(obj):
-    """Convert numpy types to native Python types for JSON serialization"""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    else:
-        return obj
+def _orjson_default(obj):
+    """Fallback for types orjson doesn't know (pandas Timestamps, exotic numpy scalars, ObjectId...)"""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def to_native(obj):
+    """numpy scalars/arrays -> plain Python (e.g. before a Mongo insert), in C via orjson"""
+    return orjson.loads(orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized by orjson in one C-level pass (numpy scalars/arrays included)"""
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+def pack_msgpack(response: Dict[str, Any]) -> bytes:
+    """
+    MessagePack body for /analyze: chart_data becomes parallel typed buffers
+    (little-endian float32 OHLC, int64 volume) instead of 300 per-candle maps
+    """
+    chart = response.get('chart_data') or []
+    payload = to_native({k: v for k, v in response.items() if k != 'chart_data'})
+    payload['chart_data'] = {
+        'times': to_native([candle['time'] for candle in chart]),
+        **{
+            f'{col}s': np.fromiter((candle[col] for candle in chart), dtype='<f4', count=len(chart)).tobytes()
+            for col in ('open', 'high', 'low', 'close')
+        },
+        'volumes': np.fromiter((candle['volume'] for candle in chart), dtype='<i8', count=len(chart)).tobytes()
+    }
+    return msgpack.packb(payload, use_bin_type=True)
 
 
 def format_price(value):
@@ -64,32 +95,37 @@ def format_percentage(value):
         return 0.00
 
 
-def clean_analysis_response(data):
-    """Clean and format all numerical values in analysis response"""
-    if isinstance(data, dict):
-        cleaned = {}
-        for key, value in data.items():
-            # Skip formatting for nested objects like 'price', 'indicators', etc
-            if key in ['price', 'indicators', 'risk_management', 'market_context', 'chart_levels', 'pivots', 'volume', 'rsi', 'stoch_rsi', 'adx', 'atr', 'macd', 'heikin_ashi', 'trend', 'gaps', 'vix', 'sp500']:
-                if isinstance(value, dict):
-                    cleaned[key] = clean_analysis_response(value)
-                elif isinstance(value, list):
-                    cleaned[key] = [clean_analysis_response(item) for item in value]
-                else:
-                    cleaned[key] = convert_numpy_types(value)
-            elif key in ['current_price', 'entry_price', 'stop_loss', 'take_profit', 'trailing_stop'] or (isinstance(key, str) and 'price' in key.lower() and key != 'price'):
-                cleaned[key] = format_price(value)
-            elif key in ['price_change_percent', 'stop_loss_percent'] or (isinstance(key, str) and 'percent' in key.lower()):
-                cleaned[key] = format_percentage(value)
-            elif isinstance(value, (dict, list)):
-                cleaned[key] = clean_analysis_response(value)
-            else:
-                cleaned[key] = convert_numpy_types(value)
-        return cleaned
-    elif isinstance(data, list):
-        return [clean_analysis_response(item) for item in data]
+INTRADAY_TIMEFRAMES = ('1h', '4h', '30m', '15m', '5m', '1m')
+
+
+def build_chart_data(data: pd.DataFrame, timeframe: str, candles: int = 300) -> List[Dict[str, Any]]:
+    """Chart candles from the last N rows - rounded/cast per column in numpy, dicts built from plain lists"""
+    tail = data.iloc[-candles:]
+    dates = pd.to_datetime(tail['date'])
+    
+    if timeframe in INTRADAY_TIMEFRAMES:
+        # For intraday: use Unix timestamp (seconds) - dates are timezone-naive UTC
+        times = ((dates - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).tolist()
     else:
-        return convert_numpy_types(data)
+        # For daily/weekly: use YYYY-MM-DD string
+        times = dates.dt.strftime('%Y-%m-%d').tolist()
+    
+    opens, highs, lows, closes = (
+        np.round(tail[col].to_numpy(dtype=np.float64), 2).tolist() for col in ('open', 'high', 'low', 'close')
+    )
+    volumes = np.nan_to_num(tail['volume'].to_numpy(dtype=np.float64), nan=0).astype(np.int64).tolist()
+    
+    chart = []
+    seen_times = set()
+    for time_value, o, h, l, c, v in zip(times, opens, highs, lows, closes, volumes):
+        # Skip duplicates (important for 1h/4h where Yahoo can have duplicates)
+        if time_value in seen_times:
+            logger.warning(f"Skipping duplicate timestamp: {time_value}")
+            continue
+        seen_times.add(time_value)
+        chart.append({'time': time_value, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v})
+    
+    return chart
 
 
 ROOT_DIR = Path(__file__).parent
@@ -100,12 +136,25 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# analysis_cache writes are fire-and-forget: queued per request, flushed in unacknowledged batches
+analysis_cache_writer = db.analysis_cache.with_options(write_concern=WriteConcern(w=0))
+ANALYSIS_CACHE_QUEUE: asyncio.Queue = asyncio.Queue(maxsize=10000)
+ANALYSIS_CACHE_BATCH_SIZE = 100
+ANALYSIS_CACHE_FLUSH_SECONDS = 0.5
+_analysis_cache_flusher: Optional[asyncio.Task] = None
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
+# /analyze results by (symbol, timeframe, period, lookback, heikin_ashi); locks vanish once unused
+ANALYSIS_CACHE = TTLCache(maxsize=1024, ttl=60)
+_ANALYSIS_LOCKS = weakref.WeakValueDictionary()
+# Fundamentals are optional for the signal - never let a slow Yahoo .info hold the response
+FUNDAMENTALS_TIMEOUT_SECONDS = 2.0
+
 # Initialize services (only stateless ones)
-provider = YahooFinanceProvider()
+yahoo_provider = YahooFinanceProvider()  # shared: HTTP session lives in yf_session.POOL
 ai_analyzer = AIAnalyzer()
 market_context = MarketContext()
 
@@ -130,6 +179,10 @@ class SymbolSearchRequest(BaseModel):
     query: str
 
 
+class SymbolSearchBatchRequest(BaseModel):
+    queries: List[str]
+
+
 class AnalyzeRequest(BaseModel):
     symbol: str
     provider: str = "yahoo"
@@ -137,6 +190,7 @@ class AnalyzeRequest(BaseModel):
     period: str = "6mo"
     lookback: int = 60
     use_heikin_ashi: bool = False
+    channel_data_limit: Optional[int] = None  # trim donchian channel_data to the first N points
 
 
 class AnalysisResponse(BaseModel):
@@ -204,6 +258,15 @@ async def search_symbols(request: SymbolSearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.post("/symbols/search/batch")
+async def search_symbols_batch(request: SymbolSearchBatchRequest):
+    """Fuzzy search for several queries in one round-trip - results keyed by query"""
+    try:
+        return {"results": {query: fuzzy_search_symbol(query) for query in request.queries}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 class OnDemandFetchRequest(BaseModel):
     symbol: str
 
@@ -222,9 +285,48 @@ async def fetch_symbol_data_on_demand(request: OnDemandFetchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_symbol(request: AnalyzeRequest):
-    """Complete technical analysis of a symbol"""
+@api_router.post("/analyze", responses={200: {"model": AnalysisResponse}})
+async def analyze_symbol(request: AnalyzeRequest, http_request: Request):
+    """Complete technical analysis of a symbol (identical requests served from a 60s cache)"""
+    key = (request.symbol.upper(), request.timeframe, request.period, request.lookback, request.use_heikin_ashi)
+    
+    response_dict = ANALYSIS_CACHE.get(key)
+    if response_dict is None:
+        # Single-flight: concurrent requests for the same key run the pipeline once
+        lock = _ANALYSIS_LOCKS.setdefault(key, asyncio.Lock())
+        async with lock:
+            response_dict = ANALYSIS_CACHE.get(key)
+            if response_dict is None:
+                response_dict = await run_analysis_pipeline(request)
+                ANALYSIS_CACHE[key] = response_dict
+    
+    if request.channel_data_limit is not None:
+        response_dict = limit_channel_data(response_dict, request.channel_data_limit)
+    
+    if 'msgpack' in http_request.headers.get('accept', ''):
+        return Response(content=pack_msgpack(response_dict), media_type='application/msgpack')
+    
+    # Returned as-is: AnalysisResponse only documents the schema, the dict is never revalidated
+    return ORJSONResponse(response_dict)
+
+
+def limit_channel_data(response_dict: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """Copy of the response with donchian channel_data cut to `limit` points (+ full count); cached dict untouched"""
+    donchian = response_dict.get('donchian_channel') or {}
+    channel_data = donchian.get('channel_data')
+    if channel_data is None:
+        return response_dict
+    
+    trimmed = {**donchian, 'channel_data': channel_data[:max(limit, 0)], 'channel_data_count': len(channel_data)}
+    return {
+        **response_dict,
+        'donchian_channel': trimmed,
+        'indicators': {**response_dict['indicators'], 'donchian': trimmed}
+    }
+
+
+async def run_analysis_pipeline(request: AnalyzeRequest) -> Dict[str, Any]:
+    """Fetch data, compute indicators/risk/signal/AI summary and build the analysis response"""
     try:
         # Step 1: Get user settings to determine provider credentials
         settings = await db.user_settings.find_one({"user_id": "default"})
@@ -234,11 +336,8 @@ async def analyze_symbol(request: AnalyzeRequest):
                 if provider.get("api_key"):
                     api_keys[provider["name"]] = provider["api_key"]
 
-        # Step 2: Initialize provider (using Yahoo Finance for all)
-        provider = YahooFinanceProvider()
-
-        # Step 3: Fetch OHLC data
-        data = await provider.get_ohlc_data(
+        # Step 2 + 3: Fetch OHLC data via the shared Yahoo Finance provider
+        data = await yahoo_provider.get_ohlc_data(
             request.symbol,
             period=request.period,
             interval=request.timeframe
@@ -249,184 +348,162 @@ async def analyze_symbol(request: AnalyzeRequest):
                 status_code=404,
                 detail=f"Simbol inexistent sau date insuficiente pentru {request.symbol}"
             )
-
-        # Step 4: Technical Analysis
-        analyzer = TechnicalAnalyzer(data)
-        indicators_raw = analyzer.calculate_all_indicators()
-        indicators = convert_numpy_types(indicators_raw)
-        
-        # Step 4.5: Check for massive drops and validate entry
-        massive_drop = PriceValidator.detect_massive_drop(data)
-        gap_reversal = PriceValidator.detect_gap_reversal(data)
-        
-        # Add to alerts if detected
-        if massive_drop:
-            alerts_raw = alerts_raw if 'alerts_raw' in locals() else []
-            alerts_raw.insert(0, {
-                'type': 'MASSIVE_DROP',
-                'severity': 'critical',
-                'message': massive_drop['warning'],
-                'action': massive_drop['action'],
-                'drop_percent': massive_drop['drop_percent'],
-                'volume_spike': massive_drop['volume_spike']
-            })
-        
-        if gap_reversal:
-            alerts_raw = alerts_raw if 'alerts_raw' in locals() else []
-            alerts_raw.insert(0, {
-                'type': 'GAP_REVERSAL',
-                'severity': 'info',
-                'message': gap_reversal['message'],
-                'action': gap_reversal['action'],
-                'recovery_percent': gap_reversal['recovery_percent']
-            })
-        
-        # Step 5: Risk Calculation
-        risk_calc = RiskCalculator(data, indicators_raw)
-        risk_data_raw = risk_calc.calculate_risk_reward(
-            lookback_days=request.lookback
-        )
-        risk_data = convert_numpy_types(risk_data_raw)
         
-        # Step 6: Market Context (VIX, S&P 500)
-        context_data_raw = await market_context.get_context()
-        context_data = convert_numpy_types(context_data_raw)
+        # One contiguous float64 buffer per column - indicator passes scan each column linearly
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            data[col] = np.ascontiguousarray(data[col].to_numpy(dtype=np.float64))
+
+        # Network steps with no data dependency: start them now, await after the CPU-bound analysis
+        context_task = asyncio.create_task(market_context.get_context())
+        fundamentals_task = asyncio.create_task(yahoo_provider.get_fundamentals(request.symbol))
         
-        # Step 6.5: Fetch fundamentals (needed for signal generation)
         try:
-            fundamentals = await provider.get_fundamentals(request.symbol)
-        except:
-            fundamentals = None
-        
-        # Step 6.9: Calculate price change BEFORE signal generation (CRITICAL)
-        current_price = float(data['close'].iloc[-1])
-        prev_price = float(data['close'].iloc[-2])
-        price_change = ((current_price - prev_price) / prev_price) * 100
-        
-        # Step 7: Generate signal and confidence (PASS price_change for drop penalty)
-        signal_data_raw = analyzer.generate_signal(
-            indicators_raw, 
-            context_data_raw,
-            risk_data,
-            earnings_days=None,  # TODO: Calculate from earnings calendar
-            fundamentals=fundamentals,  # Pass fundamentals for financial health check
-            price_change_percent=price_change  # NEW: Pass for daily drop penalty
-        )
-        signal_data = convert_numpy_types(signal_data_raw)
-        
-        # Step 8: Check for alerts (earnings, volatility)
-        alerts_raw = await market_context.check_alerts(
-            request.symbol,
-            indicators_raw,
-            context_data_raw
-        )
-        alerts = convert_numpy_types(alerts_raw)
-        
-        # Step 9: AI Analysis with fundamentals AND price change
-        ai_summary = await ai_analyzer.analyze(
-            symbol=request.symbol,
-            indicators=indicators,
-            risk_data=risk_data,
-            signal=signal_data["signal"],
-            context=context_data,
-            alerts=alerts,
-            fundamentals=fundamentals,
-            price_change_percent=price_change  # NEW: Pass for crash detection
-        )
+            # Step 4 + 5: Technical Analysis + Risk Calculation (process pool - doesn't block the event loop)
+            analyzer = TechnicalAnalyzer(data)
+            indicators, risk_data = await run_analysis(data, request.lookback)
+        
+            # Step 4.5: Check for massive drops and validate entry
+            massive_drop = PriceValidator.detect_massive_drop(data)
+            gap_reversal = PriceValidator.detect_gap_reversal(data)
+        
+            # Add to alerts if detected
+            if massive_drop:
+                alerts = alerts if 'alerts' in locals() else []
+                alerts.insert(0, {
+                    'type': 'MASSIVE_DROP',
+                    'severity': 'critical',
+                    'message': massive_drop['warning'],
+                    'action': massive_drop['action'],
+                    'drop_percent': massive_drop['drop_percent'],
+                    'volume_spike': massive_drop['volume_spike']
+                })
+        
+            if gap_reversal:
+                alerts = alerts if 'alerts' in locals() else []
+                alerts.insert(0, {
+                    'type': 'GAP_REVERSAL',
+                    'severity': 'info',
+                    'message': gap_reversal['message'],
+                    'action': gap_reversal['action'],
+                    'recovery_percent': gap_reversal['recovery_percent']
+                })
+        
+            # Step 6: Market Context (VIX, S&P 500)
+            context_data = await context_task
+        
+            # Step 6.5: Fetch fundamentals (needed for signal generation)
+            try:
+                # shield: on timeout the fetch keeps running and still warms the fundamentals cache
+                fundamentals = await asyncio.wait_for(asyncio.shield(fundamentals_task), timeout=FUNDAMENTALS_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Fundamentals for {request.symbol} timed out after {FUNDAMENTALS_TIMEOUT_SECONDS}s - continuing without")
+                fundamentals = None
+            except Exception:
+                fundamentals = None
+        
+            # Step 6.9: Calculate price change BEFORE signal generation (CRITICAL)
+            close_arr = data['close'].to_numpy()
+            current_price = float(close_arr[-1])
+            prev_price = float(close_arr[-2])
+            price_change = ((current_price - prev_price) / prev_price) * 100
+        
+            # Step 7: Generate signal and confidence (PASS price_change for drop penalty)
+            signal_data = analyzer.generate_signal(
+                indicators, 
+                context_data,
+                risk_data,
+                earnings_days=None,  # TODO: Calculate from earnings calendar
+                fundamentals=fundamentals,  # Pass fundamentals for financial health check
+                price_change_percent=price_change  # NEW: Pass for daily drop penalty
+            )
         
-        # Step 10: Build response (price_change already calculated above)
+            # Step 8: Check for alerts (earnings, volatility)
+            alerts = await market_context.check_alerts(
+                request.symbol,
+                indicators,
+                context_data
+            )
         
-        # 🔥 REALITY CHECK: Validate price against LIVE data
-        price_validation = reality_check.validate_price(request.symbol, current_price)
+            # Step 9: AI Analysis with fundamentals AND price change
+            ai_summary = await ai_analyzer.analyze(
+                symbol=request.symbol,
+                indicators=indicators,
+                risk_data=risk_data,
+                signal=signal_data["signal"],
+                context=context_data,
+                alerts=alerts,
+                fundamentals=fundamentals,
+                price_change_percent=price_change  # NEW: Pass for crash detection
+            )
         
-        if not price_validation['valid']:
-            # Price mismatch detected - use LIVE price instead
-            logger.warning(f"⚠️ Price mismatch for {request.symbol}: Using LIVE price")
-            current_price = price_validation['live_price']
-            
-            # Add warning to alerts
-            alerts.insert(0, {
-                'type': 'REALITY_CHECK',
-                'severity': 'high',
-                'message': f"⚠️ Diferență de preț detectată ({price_validation['diff_percent']:.1f}%). Folosim prețul LIVE: ${current_price:.2f}"
-            })
+            # Step 10: Build response (price_change already calculated above)
         
-        # Prepare historical OHLC data for chart (last 300 candles for zoom capability)
-        chart_data = []
-        seen_times = set()  # Track seen timestamps to avoid duplicates
+            # 🔥 REALITY CHECK: Validate price against LIVE data
+            # Blocking fast_info + retry sleeps on 429/5xx - keep them off the event loop
+            price_validation = await asyncio.to_thread(reality_check.validate_price, request.symbol, current_price)
         
-        for idx in range(max(0, len(data) - 300), len(data)):
-            row = data.iloc[idx]
-            
-            # Format time based on interval
-            if request.timeframe in ['1h', '4h', '30m', '15m', '5m', '1m']:
-                # For intraday: use Unix timestamp (seconds)
-                if hasattr(row['date'], 'timestamp'):
-                    time_value = int(row['date'].timestamp())
-                else:
-                    # Fallback: try to parse
-                    try:
-                        dt = pd.to_datetime(row['date'])
-                        time_value = int(dt.timestamp())
-                    except:
-                        time_value = str(row['date'])
-            else:
-                # For daily/weekly: use YYYY-MM-DD string
-                time_value = row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date'])
-            
-            # Skip duplicates (important for 1h/4h where Yahoo can have duplicates)
-            if time_value in seen_times:
-                logger.warning(f"Skipping duplicate timestamp: {time_value}")
-                continue
-            
-            seen_times.add(time_value)
+            if not price_validation['valid']:
+                # Price mismatch detected - use LIVE price instead
+                logger.warning(f"⚠️ Price mismatch for {request.symbol}: Using LIVE price")
+                current_price = price_validation['live_price']
             
-            chart_data.append({
-                'time': time_value,
-                'open': format_price(row['open']),
-                'high': format_price(row['high']),
-                'low': format_price(row['low']),
-                'close': format_price(row['close']),
-                'volume': int(row['volume']) if not pd.isna(row['volume']) else 0
-            })
-        
-        response_dict = {
-            'symbol': request.symbol.upper(),
-            'company_name': None,
-            'current_price': format_price(current_price),
-            'price_change_percent': format_percentage(price_change),
-            'signal': signal_data["signal"],
-            'confidence_score': int(signal_data["confidence"]),
-            'indicators': indicators,
-            'risk_management': risk_data,
-            'market_context': context_data,
-            'alerts': alerts,
-            'ai_analysis': ai_summary,
-            'chart_data': chart_data,
-            'override_reason': signal_data.get('override_reason'),
-            'chart_levels': {
-                'support': format_price(indicators['pivots']['support']),
-                'resistance': format_price(indicators['pivots']['resistance']),
-                'stop_loss': format_price(risk_data['stop_loss']),
-                'take_profit': format_price(risk_data['take_profit']),
-                'entry': format_price(risk_data['entry_price'])
-            },
-            'donchian_channel': indicators.get('donchian', {}),
-            'williams_fractals': indicators.get('fractals', {}),
-            'trend_alignment': indicators.get('trend_alignment', {}),
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Clean all numerical values
-        cleaned_response = clean_analysis_response(response_dict)
-        
-        response = AnalysisResponse(**cleaned_response)
-        
-        # Cache the analysis (without chart_data to save space)
-        cache_dict = {k: v for k, v in cleaned_response.items() if k != 'chart_data'}
-        await db.analysis_cache.insert_one(cache_dict)
+                # Add warning to alerts
+                alerts.insert(0, {
+                    'type': 'REALITY_CHECK',
+                    'severity': 'high',
+                    'message': f"⚠️ Diferență de preț detectată ({price_validation['diff_percent']:.1f}%). Folosim prețul LIVE: ${current_price:.2f}"
+                })
+        
+            # Prepare historical OHLC data for chart (last 300 candles for zoom capability)
+            chart_data = build_chart_data(data, request.timeframe)
+        
+            response_dict = {
+                'symbol': request.symbol.upper(),
+                'company_name': None,
+                'current_price': format_price(current_price),
+                'price_change_percent': format_percentage(price_change),
+                'signal': signal_data["signal"],
+                'confidence_score': int(signal_data["confidence"]),
+                'indicators': indicators,
+                'risk_management': risk_data,
+                'market_context': context_data,
+                'alerts': alerts,
+                'ai_analysis': ai_summary,
+                'chart_data': chart_data,
+                'override_reason': signal_data.get('override_reason'),
+                'chart_levels': {
+                    'support': format_price(indicators['pivots']['support']),
+                    'resistance': format_price(indicators['pivots']['resistance']),
+                    'stop_loss': format_price(risk_data['stop_loss']),
+                    'take_profit': format_price(risk_data['take_profit']),
+                    'entry': format_price(risk_data['entry_price'])
+                },
+                'donchian_channel': indicators.get('donchian', {}),
+                'williams_fractals': indicators.get('fractals', {}),
+                'trend_alignment': indicators.get('trend_alignment', {}),
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }
         
-        return response
+            # Cache the analysis (without chart_data to save space); fundamentals are kept so
+            # /analyze/stream rebuilds the same AI text
+            # Values are rounded at source; one orjson round-trip makes the numpy leaves BSON-safe
+            cache_dict = to_native({
+                **{k: v for k, v in response_dict.items() if k != 'chart_data'},
+                'fundamentals': fundamentals
+            })
+            try:
+                ANALYSIS_CACHE_QUEUE.put_nowait(cache_dict)
+            except asyncio.QueueFull:
+                logger.warning(f"analysis_cache queue full - dropping cache write for {request.symbol}")
+        
+            return response_dict
+        except BaseException:
+            # Failed request: stop the Yahoo work nobody will await (on success a timed-out
+            # fundamentals fetch is left running on purpose - it warms the cache)
+            for task in (context_task, fundamentals_task):
+                if not task.done():
+                    task.cancel()
+            raise
         
     except HTTPException:
         raise
@@ -435,6 +512,36 @@ async def analyze_symbol(request: AnalyzeRequest):
         raise HTTPException(status_code=500, detail=f"Eroare de analiză: {str(e)}")
 
 
+@api_router.get("/analyze/stream/{symbol}")
+async def analyze_symbol_stream(symbol: str):
+    """Stream the AI analysis (token by token) for the latest analysis of a symbol"""
+    latest = await db.analysis_cache.find_one(
+        {"symbol": symbol.upper()},
+        {"_id": 0},
+        sort=[("timestamp", -1)]
+    )
+    
+    if not latest:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Nu există o analiză recentă pentru {symbol}. Rulați /analyze mai întâi."
+        )
+    
+    return StreamingResponse(
+        ai_analyzer.analyze_stream(
+            symbol=latest["symbol"],
+            indicators=latest["indicators"],
+            risk_data=latest["risk_management"],
+            signal=latest["signal"],
+            context=latest["market_context"],
+            alerts=latest["alerts"],
+            fundamentals=latest.get("fundamentals"),
+            price_change_percent=latest["price_change_percent"]
+        ),
+        media_type="text/plain; charset=utf-8"
+    )
+
+
 @api_router.get("/market-context")
 async def get_market_context_endpoint():
     """Get global market context"""
@@ -449,8 +556,7 @@ async def get_market_context_endpoint():
 async def get_fundamentals(symbol: str):
     """Get fundamental data for a symbol"""
     try:
-        provider = YahooFinanceProvider()
-        fundamentals = await provider.get_fundamentals(symbol)
+        fundamentals = await yahoo_provider.get_fundamentals(symbol)
         
         if not fundamentals:
             raise HTTPException(status_code=404, detail="Fundamentals not available")
@@ -461,16 +567,28 @@ async def get_fundamentals(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+DEFAULT_SETTINGS = {
+    "user_id": "default",
+    "providers": [
+        {"name": "yahoo", "enabled": True, "api_key": None},
+        {"name": "alphavantage", "enabled": False, "api_key": None},
+        {"name": "twelvedata", "enabled": False, "api_key": None}
+    ],
+    "default_timeframe": "1d"
+}
+
+
 @api_router.post("/settings")
 async def save_settings(settings: UserSettings):
     """Save user settings"""
     try:
-        settings_dict = settings.model_dump()
-        settings_dict["created_at"] = settings_dict["created_at"].isoformat()
+        settings_dict = settings.model_dump(mode='json')
+        created_at = settings_dict.pop("created_at")
         
+        # created_at only on first insert - updates don't rewrite it
         await db.user_settings.update_one(
             {"user_id": settings.user_id},
-            {"$set": settings_dict},
+            {"$set": settings_dict, "$setOnInsert": {"created_at": created_at}},
             upsert=True
         )
         return {"success": True}
@@ -487,19 +605,8 @@ async def get_settings():
             {"_id": 0}
         )
         
-        if not settings:
-            # Return default settings
-            return {
-                "user_id": "default",
-                "providers": [
-                    {"name": "yahoo", "enabled": True, "api_key": None},
-                    {"name": "alphavantage", "enabled": False, "api_key": None},
-                    {"name": "twelvedata", "enabled": False, "api_key": None}
-                ],
-                "default_timeframe": "1d"
-            }
-        
-        return settings
+        # Return default settings if none saved
+        return ORJSONResponse(settings or DEFAULT_SETTINGS)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -510,7 +617,8 @@ async def get_live_price(symbol: str):
     Reality Check Module - Obține prețul LIVE (cache 1 minut)
     """
     try:
-        live_data = get_live_market_data(symbol)
+        # fast_info over the retrying session (sleeps on 429/5xx) - off the event loop
+        live_data = await asyncio.to_thread(get_live_market_data, symbol)
         
         if not live_data:
             raise HTTPException(
@@ -537,7 +645,7 @@ async def validate_price_endpoint(request: dict):
         if not symbol or cached_price is None:
             raise HTTPException(status_code=400, detail="Missing symbol or cached_price")
         
-        validation = reality_check.validate_price(symbol, float(cached_price))
+        validation = await asyncio.to_thread(reality_check.validate_price, symbol, float(cached_price))
         
         return validation
     except Exception as e:
@@ -563,7 +671,9 @@ async def scan_after_hours():
         
         logger.info("🌙 Starting after-hours scan...")
         
-        movers = scan_after_hours_movers(
+        # One blocking .info per watchlist symbol - run the whole scan in a worker thread
+        movers = await asyncio.to_thread(
+            scan_after_hours_movers,
             symbols=None,  # Use default watchlist
             min_change=min_change,
             min_volume=min_volume
@@ -717,17 +827,21 @@ async def audit_simulations():
     try:
         active_trades = await db.simulated_trades.find({'status': 'active'}).to_list(100)
         
-        provider = YahooFinanceProvider()
         updated_count = 0
         
+        # One batched download for all symbols instead of one request per trade
+        ohlc_by_symbol = await yahoo_provider.get_ohlc_data_batch(
+            [trade['symbol'] for trade in active_trades], period='1d', interval='1d'
+        )
+        
         for trade in active_trades:
             symbol = trade['symbol']
             
             # Fetch current price
             try:
-                data = await provider.get_ohlc_data(symbol, period='1d', interval='1d')
+                data = ohlc_by_symbol.get(symbol)
                 if data is not None and len(data) > 0:
-                    current_price = float(data['close'].iloc[-1])
+                    current_price = float(data['close'].to_numpy()[-1])
                     
                     # Check if TP or SL hit
                     if current_price >= trade['take_profit']:
@@ -896,16 +1010,19 @@ async def check_alerts():
     try:
         active_alerts = await db.alerts.find({'status': 'active', 'triggered': False}).to_list(100)
         
-        provider = YahooFinanceProvider()
         triggered_alerts = []
         
+        ohlc_by_symbol = await yahoo_provider.get_ohlc_data_batch(
+            [alert['symbol'] for alert in active_alerts], period='1d', interval='1d'
+        )
+        
         for alert in active_alerts:
             symbol = alert['symbol']
             
             try:
-                data = await provider.get_ohlc_data(symbol, period='1d', interval='1d')
+                data = ohlc_by_symbol.get(symbol)
                 if data is not None and len(data) > 0:
-                    current_price = float(data['close'].iloc[-1])
+                    current_price = float(data['close'].to_numpy()[-1])
                     
                     # Check if alert triggered
                     triggered = False
@@ -1035,13 +1152,15 @@ async def get_watchlist():
     try:
         entries = await db.watchlist.find({'status': {'$ne': 'removed'}}).sort('added_at', -1).to_list(100)
         
-        provider = YahooFinanceProvider()
+        ohlc_by_symbol = await yahoo_provider.get_ohlc_data_batch(
+            [entry['symbol'] for entry in entries], period='1d', interval='1d'
+        )
         
         for entry in entries:
             try:
-                data = await provider.get_ohlc_data(entry['symbol'], period='1d', interval='1d')
+                data = ohlc_by_symbol.get(entry['symbol'])
                 if data is not None and len(data) > 0:
-                    current_price = float(data['close'].iloc[-1])
+                    current_price = float(data['close'].to_numpy()[-1])
                     
                     # Calculate unrealized P/L
                     if current_price <= entry['ideal_entry_price'] * 1.02:
@@ -1138,6 +1257,65 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _write_analysis_cache(batch: List[Dict[str, Any]]):
+    try:
+        await analysis_cache_writer.insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.warning(f"analysis_cache batch insert failed ({len(batch)} docs): {e}")
+
+
+async def flush_analysis_cache_queue():
+    """Drain ANALYSIS_CACHE_QUEUE - one insert_many per 100 docs or 500 ms, whichever comes first"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await ANALYSIS_CACHE_QUEUE.get()]
+        deadline = loop.time() + ANALYSIS_CACHE_FLUSH_SECONDS
+        while len(batch) < ANALYSIS_CACHE_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(ANALYSIS_CACHE_QUEUE.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        await _write_analysis_cache(batch)
+
+
+@app.on_event("startup")
+async def warm_jit_kernels():
+    # Compile once here; cache=True persists it so the spawn workers load instead of recompiling
+    await asyncio.to_thread(warm_jit)
+    # Then spawn the pool workers up front - the first /analyze per worker no longer pays the startup
+    try:
+        await prime_analysis_pool()
+    except Exception as e:
+        logger.warning(f"Analysis pool warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def create_analysis_cache_index():
+    # /analyze/stream reads the newest document per symbol - index instead of scan + in-memory sort
+    try:
+        await db.analysis_cache.create_index([("symbol", 1), ("timestamp", -1)], background=True)
+    except Exception as e:
+        logger.warning(f"analysis_cache index creation failed: {e}")
+
+
+@app.on_event("startup")
+async def start_analysis_cache_flusher():
+    global _analysis_cache_flusher
+    _analysis_cache_flusher = asyncio.create_task(flush_analysis_cache_queue())
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if _analysis_cache_flusher is not None:
+        _analysis_cache_flusher.cancel()
+    # Write whatever is still queued before the client goes away
+    pending = []
+    while not ANALYSIS_CACHE_QUEUE.empty():
+        pending.append(ANALYSIS_CACHE_QUEUE.get_nowait())
+    if pending:
+        await _write_analysis_cache(pending)
     client.close()
+    shutdown_analysis_pool()
@@ -1,20 +1,241 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
+import hashlib
 import logging
+from cachetools import LRUCache
 
 # Import optimizatori
 from high_risk_optimizer import high_risk_optimizer
 from overbought_protector import overbought_protector
-from price_validator import PriceValidator
+from numba_compat import njit, NUMBA_AVAILABLE
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
 
 logger = logging.getLogger(__name__)
 
 
+# Nuclee JIT pentru buclele rând-cu-rând (fără fastmath: NaN-urile trebuie să se compare ca în Python)
+@njit(cache=True, nogil=True)
+def _heikin_ashi_open_loop(open_: np.ndarray, close: np.ndarray, ha_close: np.ndarray) -> np.ndarray:
+    """HA open[i] = (HA open[i-1] + HA close[i-1]) / 2, seeded with (open[0] + close[0]) / 2"""
+    n = open_.shape[0]
+    ha_open = np.empty(n)
+    if n == 0:
+        return ha_open
+    ha_open[0] = (open_[0] + close[0]) / 2
+    for i in range(1, n):
+        ha_open[i] = (ha_open[i - 1] + ha_close[i - 1]) / 2
+    return ha_open
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Same as Series.rolling(window).mean(): NaN until the window is full or while it holds a NaN"""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        # Direct window sum (window is small): all-zero windows stay exactly 0, no running-sum residue
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += x[j]
+        out[i] = total / window
+    return out
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _adx_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int):
+    """True Range + directional movement in one pass; returns (atr, pos_di, neg_di, adx)"""
+    n = close.shape[0]
+    tr = np.empty(n)
+    pos_dm = np.zeros(n)
+    neg_dm = np.zeros(n)
+    for i in range(n):
+        # max(h-l, |h-prev c|, |l-prev c|) skipping NaN, like DataFrame.max(axis=1)
+        tr_i = high[i] - low[i]
+        if i > 0:
+            for candidate in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if not np.isnan(candidate) and (np.isnan(tr_i) or candidate > tr_i):
+                    tr_i = candidate
+            up_move = high[i] - high[i - 1]
+            down_move = low[i - 1] - low[i]
+            if up_move > down_move and up_move > 0:
+                pos_dm[i] = up_move
+            if down_move > up_move and down_move > 0:
+                neg_dm[i] = down_move
+        tr[i] = tr_i
+    
+    atr = _rolling_mean(tr, period)
+    pos_di = 100 * (_rolling_mean(pos_dm, period) / atr)
+    neg_di = 100 * (_rolling_mean(neg_dm, period) / atr)
+    dx = 100 * np.abs(pos_di - neg_di) / (pos_di + neg_di)
+    return atr, pos_di, neg_di, _rolling_mean(dx, period)
+
+
+@njit(cache=True, nogil=True)
+def _ewma(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Series.ewm(alpha=alpha, adjust=False).mean() - same recurrence and NaN-gap handling as pandas"""
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, n):
+        cur = x[i]
+        is_observation = not np.isnan(cur)
+        if not np.isnan(weighted):
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _rsi_kernel(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI with SMA-averaged gains/losses (same definition as before) in one pass"""
+    n = close.shape[0]
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain[i] = delta
+        elif delta < 0:
+            loss[i] = -delta
+    
+    rsi = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        gain_sum = 0.0
+        loss_sum = 0.0
+        for j in range(i - period + 1, i + 1):
+            gain_sum += gain[j]
+            loss_sum += loss[j]
+        rs = (gain_sum / period) / (loss_sum / period)
+        rsi[i] = 100 - (100 / (1 + rs))
+    return rsi
+
+
+@njit(cache=True, nogil=True)
+def _rolling_minmax(min_src: np.ndarray, max_src: np.ndarray, window: int):
+    """
+    (rolling min of min_src, rolling max of max_src) in one O(n) pass with monotonic index deques.
+    Same as rolling(window).min()/.max(): NaN until the window is full or while it holds a NaN
+    """
+    n = min_src.shape[0]
+    mn = np.full(n, np.nan)
+    mx = np.full(n, np.nan)
+    min_q = np.empty(n, dtype=np.int64)
+    max_q = np.empty(n, dtype=np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+    min_nans = max_nans = 0
+    for i in range(n):
+        lo = min_src[i]
+        hi = max_src[i]
+        if np.isnan(lo):
+            min_nans += 1
+        else:
+            while min_tail > min_head and min_src[min_q[min_tail - 1]] >= lo:
+                min_tail -= 1
+            min_q[min_tail] = i
+            min_tail += 1
+        if np.isnan(hi):
+            max_nans += 1
+        else:
+            while max_tail > max_head and max_src[max_q[max_tail - 1]] <= hi:
+                max_tail -= 1
+            max_q[max_tail] = i
+            max_tail += 1
+        
+        start = i - window + 1
+        if start > 0:
+            if np.isnan(min_src[start - 1]):
+                min_nans -= 1
+            if np.isnan(max_src[start - 1]):
+                max_nans -= 1
+        while min_head < min_tail and min_q[min_head] < start:
+            min_head += 1
+        while max_head < max_tail and max_q[max_head] < start:
+            max_head += 1
+        
+        if start >= 0:
+            if min_nans == 0:
+                mn[i] = min_src[min_q[min_head]]
+            if max_nans == 0:
+                mx[i] = max_src[max_q[max_head]]
+    return mn, mx
+
+
+def _ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    EMA dispatcher: the numba kernel when JIT is available, otherwise scipy's C lfilter
+    (same recurrence, seeded with x[0]) for NaN-free input, otherwise the plain-Python _ewma
+    """
+    if NUMBA_AVAILABLE or lfilter is None or x.shape[0] == 0 or np.isnan(x).any():
+        return _ewma(x, alpha)
+    return lfilter([alpha], [1.0, alpha - 1.0], x, zi=[x[0] * (1.0 - alpha)])[0]
+
+
+def _sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Series.rolling(window).mean() on a raw array (NaN-propagating, vectorized, no numba needed)"""
+    out = np.full(x.shape[0], np.nan)
+    if x.shape[0] >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def warm_jit():
+    """Compile the JIT kernels once (length-2 dummies) so the first request doesn't pay for it"""
+    dummy = np.ones(2, dtype=np.float64)
+    _heikin_ashi_open_loop(dummy, dummy, dummy)
+    _ewma(dummy, 0.5)
+    _rsi_kernel(dummy, 1)
+    _rolling_minmax(dummy, dummy, 1)
+    _adx_kernel(dummy, dummy, dummy, 1)
+
+
 class TechnicalAnalyzer:
+    # calculate_all_indicators results by OHLCV+date fingerprint (per process - each pool worker has its own)
+    _INDICATOR_CACHE: LRUCache = LRUCache(maxsize=64)
+    
     def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+        # Shallow copy: _ensure_numeric replaces columns, it never writes into the caller's arrays
+        self.df = df.copy(deep=False)
         self._ensure_numeric()
+        
+        # Column buffers (float64, contiguous) shared by every numeric indicator
+        self._o, self._h, self._l, self._c, self._v = (
+            np.ascontiguousarray(self.df[col].to_numpy(dtype=np.float64))
+            for col in ('open', 'high', 'low', 'close', 'volume')
+        )
+        self._n = len(self.df)
+        self._adx_cache: Dict[int, tuple] = {}
+        self._ema_cache: Dict[int, np.ndarray] = {}
+        self._rsi_cache: Dict[int, np.ndarray] = {}
+        self._date_str: Optional[np.ndarray] = None
+    
+    def _date_strings(self) -> np.ndarray:
+        """'YYYY-MM-DD' per row, formatted in one pass (str(date) for non-datetime values)"""
+        if self._date_str is None:
+            dates = self.df['date']
+            if pd.api.types.is_datetime64_any_dtype(dates):
+                self._date_str = dates.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+            else:
+                self._date_str = np.array(
+                    [d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d) for d in dates],
+                    dtype=object
+                )
+        return self._date_str
     
     def _ensure_numeric(self):
         """Ensure all price columns are numeric"""
@@ -22,77 +243,77 @@ class TechnicalAnalyzer:
             if col in self.df.columns:
                 self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
     
+    def _ema_array(self, period: int) -> np.ndarray:
+        """EMA of close as an array - each span computed at most once per analyzer"""
+        ema = self._ema_cache.get(period)
+        if ema is None:
+            ema = _ema(self._c, 2.0 / (period + 1))
+            self._ema_cache[period] = ema
+        return ema
+    
     def calculate_ema(self, period: int) -> pd.Series:
         """Calculate Exponential Moving Average"""
-        return self.df['close'].ewm(span=period, adjust=False).mean()
+        return pd.Series(self._ema_array(period), index=self.df.index)
     
     def calculate_sma(self, period: int) -> pd.Series:
         """Calculate Simple Moving Average"""
-        return self.df['close'].rolling(window=period).mean()
+        return pd.Series(_sma(self._c, period), index=self.df.index)
+    
+    def _rsi_array(self, period: int) -> np.ndarray:
+        """RSI as an array - computed once per period (Stoch-RSI reuses it)"""
+        rsi = self._rsi_cache.get(period)
+        if rsi is None:
+            # errstate only matters for the no-numba fallback (numba kernels never warn)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = _rsi_kernel(self._c, period)
+            self._rsi_cache[period] = rsi
+        return rsi
     
     def calculate_rsi(self, period: int = 14) -> pd.Series:
         """Calculate Relative Strength Index"""
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(self._rsi_array(period), index=self.df.index)
     
     def calculate_stoch_rsi(self, period: int = 14, smooth_k: int = 3, smooth_d: int = 3) -> Dict[str, pd.Series]:
         """Calculate Stochastic RSI"""
-        rsi = self.calculate_rsi(period)
+        rsi = self._rsi_array(period)
+        rsi_min, rsi_max = _rolling_minmax(rsi, rsi, period)
         
-        stoch_rsi = (rsi - rsi.rolling(window=period).min()) / \
-                    (rsi.rolling(window=period).max() - rsi.rolling(window=period).min()) * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_rsi = (rsi - rsi_min) / (rsi_max - rsi_min) * 100
         
-        k = stoch_rsi.rolling(window=smooth_k).mean()
-        d = k.rolling(window=smooth_d).mean()
+        k = _sma(stoch_rsi, smooth_k)
+        d = _sma(k, smooth_d)
         
-        return {'k': k, 'd': d, 'stoch_rsi': stoch_rsi}
+        index = self.df.index
+        return {
+            'k': pd.Series(k, index=index),
+            'd': pd.Series(d, index=index),
+            'stoch_rsi': pd.Series(stoch_rsi, index=index)
+        }
+    
+    def _adx_arrays(self, period: int) -> tuple:
+        """(atr, pos_di, neg_di, adx) arrays - computed once per period, shared by ADX and ATR"""
+        result = self._adx_cache.get(period)
+        if result is None:
+            # errstate only matters for the no-numba fallback (numba kernels never warn)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = _adx_kernel(self._h, self._l, self._c, period)
+            self._adx_cache[period] = result
+        return result
     
     def calculate_adx(self, period: int = 14) -> Dict[str, pd.Series]:
         """Calculate Average Directional Index"""
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close']
-        
-        # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        # Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-        
-        pos_dm = up_move.where((up_move > down_move) & (up_move > 0), 0)
-        neg_dm = down_move.where((down_move > up_move) & (down_move > 0), 0)
-        
-        pos_di = 100 * (pos_dm.rolling(window=period).mean() / atr)
-        neg_di = 100 * (neg_dm.rolling(window=period).mean() / atr)
-        
-        dx = 100 * abs(pos_di - neg_di) / (pos_di + neg_di)
-        adx = dx.rolling(window=period).mean()
-        
-        return {'adx': adx, 'pos_di': pos_di, 'neg_di': neg_di}
+        _, pos_di, neg_di, adx = self._adx_arrays(period)
+        index = self.df.index
+        return {
+            'adx': pd.Series(adx, index=index),
+            'pos_di': pd.Series(pos_di, index=index),
+            'neg_di': pd.Series(neg_di, index=index)
+        }
     
     def calculate_atr(self, period: int = 14) -> pd.Series:
         """Calculate Average True Range"""
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
-        atr = tr.rolling(window=period).mean()
-        return atr
+        return pd.Series(self._adx_arrays(period)[0], index=self.df.index)
     
     def calculate_vwap(self) -> pd.Series:
         """Calculate Volume Weighted Average Price"""
@@ -105,61 +326,61 @@ class TechnicalAnalyzer:
     
     def calculate_macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
         """Calculate MACD"""
-        ema_fast = self.calculate_ema(fast)
-        ema_slow = self.calculate_ema(slow)
-        
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        macd_line = self._ema_array(fast) - self._ema_array(slow)
+        signal_line = _ema(macd_line, 2.0 / (signal + 1))
         histogram = macd_line - signal_line
         
-        return {'macd': macd_line, 'signal': signal_line, 'histogram': histogram}
+        index = self.df.index
+        return {
+            'macd': pd.Series(macd_line, index=index),
+            'signal': pd.Series(signal_line, index=index),
+            'histogram': pd.Series(histogram, index=index)
+        }
     
     def calculate_heikin_ashi(self) -> pd.DataFrame:
         """Calculate Heikin Ashi candles"""
-        ha_df = pd.DataFrame(index=self.df.index)
-        
-        ha_df['close'] = (self.df['open'] + self.df['high'] + 
-                          self.df['low'] + self.df['close']) / 4
-        
-        ha_df['open'] = 0.0
-        for i in range(len(self.df)):
-            if i == 0:
-                ha_df.loc[i, 'open'] = (self.df.loc[i, 'open'] + self.df.loc[i, 'close']) / 2
-            else:
-                ha_df.loc[i, 'open'] = (ha_df.loc[i-1, 'open'] + ha_df.loc[i-1, 'close']) / 2
-        
-        ha_df['high'] = self.df[['high', 'open', 'close']].max(axis=1)
-        ha_df['low'] = self.df[['low', 'open', 'close']].min(axis=1)
-        
-        return ha_df
+        o, h, l, c = self._o, self._h, self._l, self._c
+        
+        ha_close = (o + h + l + c) * 0.25
+        ha_open = _heikin_ashi_open_loop(o, c, ha_close)
+        
+        # fmax/fmin skip NaN like DataFrame.max(axis=1)
+        return pd.DataFrame({
+            'close': ha_close,
+            'open': ha_open,
+            'high': np.fmax(np.fmax(h, o), c),
+            'low': np.fmin(np.fmin(l, o), c)
+        }, index=self.df.index)
     
     def detect_gaps(self) -> list:
-        """Detect price gaps"""
+        """Detect price gaps (last 5)"""
+        closes = self._c
+        opens = self._o
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap_sizes = (opens[1:] - closes[:-1]) / closes[:-1] * 100
+        gap_idx = np.flatnonzero(np.abs(gap_sizes) > 2)[-5:] + 1
+        dates = self.df['date'].iloc[gap_idx].tolist()
+        
         gaps = []
-        for i in range(1, len(self.df)):
-            prev_close = self.df.loc[i-1, 'close']
-            curr_open = self.df.loc[i, 'open']
-            
-            gap_size = ((curr_open - prev_close) / prev_close) * 100
-            
-            if abs(gap_size) > 2:
-                gaps.append({
-                    'index': i,
-                    'date': self.df.loc[i, 'date'],
-                    'gap_size': round(gap_size, 2),
-                    'gap_price': round(prev_close, 2),
-                    'type': 'up' if gap_size > 0 else 'down'
-                })
-        
-        return gaps[-5:] if len(gaps) > 5 else gaps
+        for i, date in zip(gap_idx.tolist(), dates):
+            gap_size = gap_sizes[i - 1]
+            gaps.append({
+                'index': i,
+                'date': date,
+                'gap_size': round(gap_size, 2),
+                'gap_price': round(closes[i - 1], 2),
+                'type': 'up' if gap_size > 0 else 'down'
+            })
+        
+        return gaps
     
     def calculate_pivot_points(self, lookback: int = 20) -> Dict[str, float]:
         """Calculate support and resistance levels"""
-        recent_data = self.df.tail(lookback)
-        
-        high = recent_data['high'].max()
-        low = recent_data['low'].min()
-        close = recent_data['close'].iloc[-1]
+        # nanmax/nanmin skip NaN like Series.max()/min()
+        high = np.nanmax(self._h[-lookback:])
+        low = np.nanmin(self._l[-lookback:])
+        close = self._c[-1]
         
         pivot = (high + low + close) / 3
         
@@ -181,25 +402,32 @@ class TechnicalAnalyzer:
     
     def calculate_donchian_channel(self, period: int = 20) -> Dict[str, Any]:
         """Calculate Donchian Channel - Fixed for 2025"""
-        high_channel = self.df['high'].rolling(window=period).max()
-        low_channel = self.df['low'].rolling(window=period).min()
+        low_channel, high_channel = _rolling_minmax(self._l, self._h, period)
         
         # REPARARE: Validate all prices (no negative values)
-        low_channel = low_channel.apply(lambda x: PriceValidator.validate_price(x))
-        high_channel = high_channel.apply(lambda x: PriceValidator.validate_price(x))
+        # Vectorized PriceValidator.validate_price: fmax maps NaN and anything below 0.01 to 0.01
+        low_channel = pd.Series(np.fmax(low_channel, 0.01), index=self.df.index)
+        high_channel = pd.Series(np.fmax(high_channel, 0.01), index=self.df.index)
         
         middle_channel = (high_channel + low_channel) / 2
         
-        # Get last N values for chart overlay
-        channel_data = []
-        for i in range(max(0, len(self.df) - 300), len(self.df)):
-            if pd.notna(high_channel.iloc[i]) and pd.notna(low_channel.iloc[i]):
-                channel_data.append({
-                    'time': self.df.iloc[i]['date'].strftime('%Y-%m-%d') if hasattr(self.df.iloc[i]['date'], 'strftime') else str(self.df.iloc[i]['date']),
-                    'upper': round(float(high_channel.iloc[i]), 2),
-                    'lower': round(float(low_channel.iloc[i]), 2),
-                    'middle': round(float(middle_channel.iloc[i]), 2)
-                })
+        # Get last N values for chart overlay (slice once, then zip plain lists)
+        start = max(0, self._n - 300)
+        dates = self._date_strings()[start:].tolist()
+        uppers = high_channel.to_numpy()[start:].tolist()
+        lowers = low_channel.to_numpy()[start:].tolist()
+        middles = middle_channel.to_numpy()[start:].tolist()
+        
+        channel_data = [
+            {
+                'time': date,
+                'upper': round(upper, 2),
+                'lower': round(lower, 2),
+                'middle': round(middle, 2)
+            }
+            for date, upper, lower, middle in zip(dates, uppers, lowers, middles)
+            if not (np.isnan(upper) or np.isnan(lower))
+        ]
         
         return {
             'upper': round(float(high_channel.iloc[-1]), 2),
@@ -210,51 +438,59 @@ class TechnicalAnalyzer:
     
     def calculate_williams_fractals(self, period: int = 5) -> Dict[str, Any]:
         """Calculate Williams Fractals (Pivot points for reversals)"""
-        fractals = []
         half_period = period // 2
-        
-        for i in range(half_period, len(self.df) - half_period):
-            # Bullish fractal (low is lowest)
-            is_bullish = True
-            for j in range(i - half_period, i + half_period + 1):
-                if j != i and self.df.iloc[j]['low'] <= self.df.iloc[i]['low']:
-                    is_bullish = False
-                    break
-            
-            # Bearish fractal (high is highest)
-            is_bearish = True
-            for j in range(i - half_period, i + half_period + 1):
-                if j != i and self.df.iloc[j]['high'] >= self.df.iloc[i]['high']:
-                    is_bearish = False
-                    break
-            
-            if is_bullish or is_bearish:
-                fractals.append({
-                    'time': self.df.iloc[i]['date'].strftime('%Y-%m-%d') if hasattr(self.df.iloc[i]['date'], 'strftime') else str(self.df.iloc[i]['date']),
-                    'type': 'bullish' if is_bullish else 'bearish',
-                    'price': round(float(self.df.iloc[i]['low'] if is_bullish else self.df.iloc[i]['high']), 2)
-                })
+        window = 2 * half_period + 1
+        if self._n < window:
+            return {'fractals': []}
+        
+        high = self._h
+        low = self._l
+        
+        # One row per candidate bar: center column = the bar, the rest = its neighbours
+        low_windows = np.lib.stride_tricks.sliding_window_view(low, window)
+        high_windows = np.lib.stride_tricks.sliding_window_view(high, window)
+        
+        # Bullish: no neighbour low <= center low; bearish: no neighbour high >= center high
+        # (written as "no neighbour disqualifies" so NaN compares exactly like the old scalar loop)
+        low_hits = low_windows <= low_windows[:, half_period, None]
+        high_hits = high_windows >= high_windows[:, half_period, None]
+        low_hits[:, half_period] = False
+        high_hits[:, half_period] = False
+        is_bullish = ~low_hits.any(axis=1)
+        is_bearish = ~high_hits.any(axis=1)
         
         # Return last 20 fractals for chart display
-        return {
-            'fractals': fractals[-20:] if len(fractals) > 20 else fractals
-        }
+        fractal_idx = np.flatnonzero(is_bullish | is_bearish)[-20:]
+        dates = self._date_strings()[fractal_idx + half_period].tolist()
+        
+        fractals = []
+        for w, date in zip(fractal_idx.tolist(), dates):
+            i = w + half_period
+            bullish = is_bullish[w]
+            fractals.append({
+                'time': date,
+                'type': 'bullish' if bullish else 'bearish',
+                'price': round(float(low[i] if bullish else high[i]), 2)
+            })
+        
+        return {'fractals': fractals}
     
     def calculate_trend_alignment(self) -> Dict[str, Any]:
         """
         Calculate Daily vs Weekly trend alignment based on EMAs
         FIXED: Only show aligned when BOTH trends are BULLISH (or BOTH BEARISH with warning)
         """
-        ema_20 = self.calculate_ema(20)
-        ema_50 = self.calculate_ema(50)
+        # Cache hits: calculate_all_indicators already computed both spans
+        ema_20_last = self._ema_array(20)[-1]
+        ema_50_last = self._ema_array(50)[-1]
         
-        current_price = float(self.df['close'].iloc[-1])
+        current_price = float(self._c[-1])
         
         # Daily trend based on EMA 20
-        daily_trend = "BULLISH" if current_price > ema_20.iloc[-1] else "BEARISH"
+        daily_trend = "BULLISH" if current_price > ema_20_last else "BEARISH"
         
         # Weekly trend based on EMA 50 (simulates weekly)
-        weekly_trend = "BULLISH" if current_price > ema_50.iloc[-1] else "BEARISH"
+        weekly_trend = "BULLISH" if current_price > ema_50_last else "BEARISH"
         
         # Check alignment - ONLY if BOTH are same direction
         aligned = daily_trend == weekly_trend
@@ -273,11 +509,11 @@ class TechnicalAnalyzer:
         return {
             'daily': {
                 'trend': daily_trend,
-                'ema_value': round(float(ema_20.iloc[-1]), 2)
+                'ema_value': round(float(ema_20_last), 2)
             },
             'weekly': {
                 'trend': weekly_trend,
-                'ema_value': round(float(ema_50.iloc[-1]), 2)
+                'ema_value': round(float(ema_50_last), 2)
             },
             'aligned': aligned,
             'signal_strength': signal_strength,
@@ -286,16 +522,20 @@ class TechnicalAnalyzer:
     
     def analyze_volume(self) -> Dict[str, Any]:
         """Analyze volume patterns"""
-        volume_ma20 = self.df['volume'].rolling(window=20).mean()
-        current_volume = self.df['volume'].iloc[-1]
-        avg_volume = volume_ma20.iloc[-1]
+        # Last value of rolling(20).mean(): NaN on short history or a NaN in the window
+        current_volume = self._v[-1]
+        avg_volume = self._v[-20:].mean() if self._n >= 20 else np.nan
         
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
         
-        # Volume trend
-        recent_volumes = self.df['volume'].tail(5)
-        volume_trend = "crescător" if recent_volumes.is_monotonic_increasing else \
-                      "descrescător" if recent_volumes.is_monotonic_decreasing else "mixt"
+        # Volume trend (any NaN in the last 5 -> "mixt", like is_monotonic_*)
+        recent_volumes = self._v[-5:]
+        volume_steps = np.diff(recent_volumes)
+        if np.isnan(recent_volumes).any():
+            volume_trend = "mixt"
+        else:
+            volume_trend = "crescător" if (volume_steps >= 0).all() else \
+                          "descrescător" if (volume_steps <= 0).all() else "mixt"
         
         return {
             'current': float(current_volume),
@@ -305,17 +545,36 @@ class TechnicalAnalyzer:
             'exhaustion': volume_ratio < 0.7
         }
     
+    def _fingerprint(self) -> bytes:
+        """Hash of everything calculate_all_indicators reads: OHLCV buffers, dates and index"""
+        digest = hashlib.blake2b(digest_size=16)
+        for arr in (self._o, self._h, self._l, self._c, self._v):
+            digest.update(arr.tobytes())
+        digest.update(pd.util.hash_pandas_object(self.df['date'], index=True).to_numpy().tobytes())
+        return digest.digest()
+    
     def calculate_all_indicators(self) -> Dict[str, Any]:
-        """Calculate all technical indicators"""
+        """Calculate all technical indicators (memoized for identical OHLCV data)"""
+        key = (self._n, self._fingerprint())
+        indicators = TechnicalAnalyzer._INDICATOR_CACHE.get(key)
+        if indicators is None:
+            indicators = self._compute_all_indicators()
+            TechnicalAnalyzer._INDICATOR_CACHE[key] = indicators
+        return indicators
+    
+    def _compute_all_indicators(self) -> Dict[str, Any]:
         try:
+            # 200-period averages are only reported with >= 200 bars - skip them on short history
+            has_200 = self._n >= 200
+            
             # EMAs
             ema_20 = self.calculate_ema(20)
             ema_50 = self.calculate_ema(50)
-            ema_200 = self.calculate_ema(200)
+            ema_200 = self.calculate_ema(200) if has_200 else None
             
             # SMAs
             sma_20 = self.calculate_sma(20)
-            sma_200 = self.calculate_sma(200)
+            sma_200 = self.calculate_sma(200) if has_200 else None
             
             # VWAP
             vwap = self.calculate_vwap()
@@ -368,9 +627,9 @@ class TechnicalAnalyzer:
                     'current': round(current_price, 2),
                     'ema_20': round(float(ema_20.iloc[-1]), 2),
                     'ema_50': round(float(ema_50.iloc[-1]), 2),
-                    'ema_200': round(float(ema_200.iloc[-1]), 2) if len(self.df) >= 200 else None,
+                    'ema_200': round(float(ema_200.iloc[-1]), 2) if has_200 else None,
                     'sma_20': round(float(sma_20.iloc[-1]), 2),
-                    'sma_200': round(float(sma_200.iloc[-1]), 2) if len(self.df) >= 200 else None,
+                    'sma_200': round(float(sma_200.iloc[-1]), 2) if has_200 else None,
                     'vwap': round(float(vwap.iloc[-1]), 2)
                 },
                 'rsi': {
@@ -399,7 +658,7 @@ class TechnicalAnalyzer:
                     'sma_20': [{'time': str(self.df.index[i]), 'value': round(float(sma_20.iloc[i]), 2)} 
                               for i in range(len(sma_20)) if not pd.isna(sma_20.iloc[i])],
                     'sma_200': [{'time': str(self.df.index[i]), 'value': round(float(sma_200.iloc[i]), 2)} 
-                               for i in range(len(sma_200)) if not pd.isna(sma_200.iloc[i])] if len(self.df) >= 200 else []
+                               for i in range(len(sma_200)) if not pd.isna(sma_200.iloc[i])] if has_200 else []
                 },
                 'vwap_series': [{'time': str(self.df.index[i]), 'value': round(float(vwap.iloc[i]), 2)} 
                                for i in range(len(vwap)) if not pd.isna(vwap.iloc[i])],
@@ -0,0 +1,51 @@
+"""
+YFinance Session Pool
+One shared HTTP session for every yf.Ticker - keep-alive + retry with backoff on 429/5xx
+"""
+import logging
+import threading
+import time
+
+from curl_cffi import requests as curl_requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_FORCELIST = frozenset({429, 500, 502, 503, 504})
+
+
+class RetrySession(curl_requests.Session):
+    """curl_cffi Session that retries transient Yahoo errors (yfinance 1.x requires curl_cffi)"""
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(RETRY_TOTAL + 1):
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except curl_requests.RequestsError:
+                if attempt == RETRY_TOTAL:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_FORCELIST or attempt == RETRY_TOTAL:
+                    return response
+            time.sleep(RETRY_BACKOFF_FACTOR * (2 ** attempt))
+            logger.warning("Yahoo request retry %d for %s", attempt + 1, url)
+
+
+class YFinancePool:
+    """Singleton holder for the shared yfinance session"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.session = RetrySession(impersonate="chrome")
+                    cls._instance = instance
+        return cls._instance
+
+
+POOL = YFinancePool()
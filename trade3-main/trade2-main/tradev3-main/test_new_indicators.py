@@ -5,6 +5,8 @@ Test script specifically for new indicators: Donchian Channel, Williams Fractals
 
 import requests
 import json
+import orjson
+from collections import Counter
 
 def test_new_indicators():
     """Test the new indicators added to the trading system"""
@@ -20,7 +22,8 @@ def test_new_indicators():
         "provider": "yahoo",
         "timeframe": "1d",
         "period": "6mo",
-        "lookback": 60
+        "lookback": 60,
+        "channel_data_limit": 2  # only the count + a sample are checked; older servers ignore it
     }
     
     try:
@@ -30,7 +33,7 @@ def test_new_indicators():
             print(f"❌ API call failed with status {response.status_code}")
             return False
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Test Donchian Channel
         print("\n📊 Testing Donchian Channel...")
@@ -43,7 +46,7 @@ def test_new_indicators():
             
             # Check if channel_data exists for chart
             channel_data = donchian.get('channel_data', [])
-            print(f"   Chart data points: {len(channel_data)}")
+            print(f"   Chart data points: {donchian.get('channel_data_count', len(channel_data))}")
             
             if len(channel_data) > 0:
                 print(f"   Sample data: {channel_data[0]}")
@@ -59,8 +62,9 @@ def test_new_indicators():
             print(f"   Fractal points: {len(fractal_points)}")
             
             if len(fractal_points) > 0:
-                bullish_count = sum(1 for f in fractal_points if f.get('type') == 'bullish')
-                bearish_count = sum(1 for f in fractal_points if f.get('type') == 'bearish')
+                type_counts = Counter(f.get('type') for f in fractal_points)
+                bullish_count = type_counts['bullish']
+                bearish_count = type_counts['bearish']
                 print(f"   Bullish fractals: {bullish_count}")
                 print(f"   Bearish fractals: {bearish_count}")
                 print(f"   Sample fractal: {fractal_points[0]}")